@@ -0,0 +1,143 @@
+"""
+Length-bucketed, token-budgeted batch encoding for the ingest.
+
+Chunks range from short page tails to full 1000-char chunks, and a batch is
+padded to its longest member. encode_by_token_budget sorts chunks by token
+length, packs neighbours into batches whose padded size (batch size x
+longest chunk) stays under a token budget, encodes them, and puts the
+vectors back in input order. Padding is masked out by the model, so the
+vectors match encoding in file order (up to float rounding).
+
+Usage (compare with encode() per upsert batch, as the ingest did before):
+    python batch_encoder.py                       # PDF_FILE_PATH from c_e_utils
+    python batch_encoder.py path/to/DRHP --chunks 2000 --budget 8192 --group 256
+"""
+
+import os
+import sys
+import time
+import argparse
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+# padded tokens per encode batch (e.g. 32 full 256-token chunks)
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "8192"))
+
+
+def token_lengths(embedding_model, texts: Sequence[str]) -> List[int]:
+    """Token count of every text as the model will see it (special tokens, truncation)."""
+    encoded = embedding_model.tokenizer(
+        list(texts), add_special_tokens=True, truncation=True, max_length=embedding_model.max_seq_length
+    )
+    return [len(ids) for ids in encoded['input_ids']]
+
+
+def plan_batches(lengths: Sequence[int], max_batch_tokens: int) -> List[List[int]]:
+    """Indices grouped into batches of similar length whose padded size fits max_batch_tokens."""
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches = []
+    batch = []
+    longest = 0
+    for index in order:
+        length = lengths[index]
+        # sorted ascending, so the newcomer is the longest of the batch
+        if batch and (len(batch) + 1) * max(longest, length) > max_batch_tokens:
+            batches.append(batch)
+            batch = []
+            longest = 0
+        batch.append(index)
+        longest = max(longest, length)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def encode_by_token_budget(
+    embedding_model,
+    texts: Sequence[str],
+    max_batch_tokens: int = EMBED_BATCH_TOKENS
+) -> Tuple[np.ndarray, Dict]:
+    """
+    Encode texts in length-sorted, token-budgeted batches.
+
+    Returns:
+        (embeddings in input order, stats) with stats: texts, tokens,
+        padded_tokens, padding_ratio, batches, seconds, texts_per_sec, tokens_per_sec
+    """
+    started = time.perf_counter()
+    lengths = token_lengths(embedding_model, texts)
+    batches = plan_batches(lengths, max_batch_tokens)
+
+    embeddings = None
+    for batch in batches:
+        vectors = embedding_model.encode([texts[i] for i in batch], batch_size=len(batch))
+        if embeddings is None:
+            embeddings = np.empty((len(texts), vectors.shape[1]), dtype=vectors.dtype)
+        embeddings[batch] = vectors
+
+    seconds = time.perf_counter() - started
+    tokens = sum(lengths)
+    padded_tokens = sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+    stats = {
+        'texts': len(texts),
+        'tokens': tokens,
+        'padded_tokens': padded_tokens,
+        'padding_ratio': padded_tokens / tokens if tokens else 1.0,
+        'batches': len(batches),
+        'seconds': seconds,
+        'texts_per_sec': len(texts) / seconds if seconds else 0.0,
+        'tokens_per_sec': tokens / seconds if seconds else 0.0,
+    }
+    if embeddings is None:
+        embeddings = np.empty((0, embedding_model.get_sentence_embedding_dimension()), dtype=np.float32)
+    return embeddings, stats
+
+
+def main():
+    from c_e_utils import PDF_FILE_PATH, get_embedding_model
+    from chunking_dhrp import iter_pdf_chunks
+    from embedding_dhrp import BATCH_SIZE, batched
+
+    parser = argparse.ArgumentParser(description="Token-budgeted vs plain encoding on DRHP chunks.")
+    parser.add_argument("folder", nargs="?", default=PDF_FILE_PATH)
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--budget", type=int, default=EMBED_BATCH_TOKENS)
+    parser.add_argument("--group", type=int, default=BATCH_SIZE, help="chunks per ingest upsert batch")
+    parser.add_argument("--batch-size", type=int, default=32, help="plain encode batch size")
+    args = parser.parse_args()
+
+    texts = [chunk['text'] for chunk in islice(iter_pdf_chunks(args.folder), args.chunks)]
+    if not texts:
+        print(f"No chunks found in {Path(args.folder)}")
+        return 1
+
+    embedding_model = get_embedding_model()
+    embedding_model.encode(texts[:8])  # warm-up
+
+    # what the ingest did before: one encode() call per upsert batch, which
+    # already length-sorts within the call into fixed batch_size batches
+    groups = list(batched(texts, args.group))
+    started = time.perf_counter()
+    plain = np.concatenate([embedding_model.encode(group, batch_size=args.batch_size) for group in groups])
+    plain_seconds = time.perf_counter() - started
+
+    results = [encode_by_token_budget(embedding_model, group, args.budget) for group in groups]
+    budgeted = np.concatenate([embeddings for embeddings, _ in results])
+    budget_seconds = sum(stats['seconds'] for _, stats in results)
+    tokens = sum(stats['tokens'] for _, stats in results)
+    padded_tokens = sum(stats['padded_tokens'] for _, stats in results)
+
+    print(f"{len(texts)} chunks in {len(groups)} upsert batches of {args.group}, {tokens:,} tokens")
+    print(f"  encode(batch_size={args.batch_size}): {plain_seconds:.2f}s ({len(texts) / plain_seconds:.1f} chunks/s)")
+    print(f"  token budget {args.budget}: {budget_seconds:.2f}s ({len(texts) / budget_seconds:.1f} chunks/s), "
+          f"{sum(stats['batches'] for _, stats in results)} batches, padding x{padded_tokens / tokens:.2f}")
+    print(f"  max |difference| between vectors: {np.max(np.abs(plain - budgeted)):.2e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,30 @@
+import os
 import sys
 from pathlib import Path
-import chromadb
-from sentence_transformers import SentenceTransformer
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-DB_PATH = r"C:\Users\rauna\projects\My Projects\IPO_Checker\ChromaDB"
-chroma_client = chromadb.PersistentClient(path=DB_PATH)
-
-COLLECTION_NAME = 'dhrp_embeddings_collection'
+# model, chroma client and settings are shared with the query side and
+# created lazily on first use; EMBEDDING_BACKEND (env) picks torch / onnx / int8 encoding
+from Utilities.utils import (COLLECTION_NAME, INGEST_MANIFEST_PATH, VECTOR_COMPRESSION, compressed_collection_name,
+                             compressor_path, get_chroma_client, get_embedding_model, get_lexical_index,
+                             get_rerank_store)
+from Utilities.company_utils import company_key
 
 #DHRP PDF FILE PATH
-PDF_FILE_PATH = r'C:\Users\rauna\projects\My Projects\IPO_Checker\DRHP'
+PDF_FILE_PATH = os.getenv("IPO_CHECKER_DRHP_PATH", str(Path(__file__).resolve().parent.parent / "DRHP"))
+
+# names the ingest scripts import from here
+__all__ = [
+    "PDF_FILE_PATH", "COLLECTION_NAME", "INGEST_MANIFEST_PATH", "VECTOR_COMPRESSION",
+    "compressed_collection_name", "compressor_path", "company_key",
+    "get_chroma_client", "get_embedding_model", "get_lexical_index", "get_rerank_store",
+]
 
-EMBEDDING_MODEL = 'multi-qa-mpnet-base-dot-v1'
-# DB_PATH = r"C:\Users\rauna\projects\My Projects\IPO_Checker\ChromaDB"
-embedding_model = SentenceTransformer(EMBEDDING_MODEL)
 
+def __getattr__(name):
+    if name == "chroma_client":
+        return get_chroma_client()
+    if name == "embedding_model":
+        return get_embedding_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
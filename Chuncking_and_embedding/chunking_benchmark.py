@@ -0,0 +1,163 @@
+"""
+Micro-benchmark for the sentence chunker.
+
+Compares the current _split_text_into_chunks with the previous implementation
+(kept below as _split_text_into_chunks_legacy) on a large synthetic set of
+DRHP-like pages, checks that both produce identical chunks and reports
+throughput.
+
+Usage:
+    python chunking_benchmark.py --pages 2000 --repeat 3
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from chunking_dhrp import _split_text_into_chunks
+
+
+def _split_text_into_chunks_legacy(
+    text: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> List[str]:
+    # previous implementation, re-splits every chunk to compute its overlap
+    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+    sentences = [s.strip() for s in sentences if s.strip()]
+
+    if not sentences:
+        return []
+
+    if len(sentences) == 1:
+        return sentences
+
+    chunks = []
+    i = 0
+
+    while i < len(sentences):
+        chunk_sentences = []
+        chunk_length = 0
+
+        while i < len(sentences):
+            sentence = sentences[i]
+            sentence_length = len(sentence)
+
+            if chunk_length + sentence_length + (1 if chunk_sentences else 0) <= chunk_size:
+                chunk_sentences.append(sentence)
+                chunk_length += sentence_length + (1 if len(chunk_sentences) > 1 else 0)
+                i += 1
+            else:
+                break
+
+        if not chunk_sentences:
+            chunk_sentences.append(sentences[i])
+            i += 1
+
+        chunks.append(' '.join(chunk_sentences))
+
+    if len(chunks) > 1:
+        overlapped_chunks = [chunks[0]]
+
+        for idx in range(1, len(chunks)):
+            prev_chunk = chunks[idx - 1]
+            curr_chunk = chunks[idx]
+
+            prev_sentences = re.split(r'(?<=[.!?])\s+', prev_chunk.strip())
+            prev_sentences = [s.strip() for s in prev_sentences if s.strip()]
+
+            overlap_sentences = []
+            overlap_length = 0
+
+            for sent in reversed(prev_sentences):
+                if overlap_length + len(sent) + 1 <= chunk_overlap:
+                    overlap_sentences.insert(0, sent)
+                    overlap_length += len(sent) + 1
+                else:
+                    break
+
+            if overlap_sentences:
+                overlapped_chunk = ' '.join(overlap_sentences) + ' ' + curr_chunk
+            else:
+                overlapped_chunk = curr_chunk
+
+            overlapped_chunks.append(overlapped_chunk)
+
+        return overlapped_chunks
+
+    return chunks
+
+
+_WORDS = (
+    "the company offer equity shares promoter selling shareholders book running lead managers "
+    "fresh issue net proceeds working capital revenue from operations EBITDA profit after tax "
+    "manufacturing facility capacity utilisation raw material customers subsidiaries litigation "
+    "SEBI ICDR regulations Rs. crore lakh fiscal financial year ended March restated consolidated"
+).split()
+
+
+def make_synthetic_pages(n_pages: int, seed: int = 7) -> List[str]:
+    """DRHP-like pages: prose, short headings, numbers with dots and long table rows."""
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(n_pages):
+        parts = []
+        for _ in range(rng.randint(5, 60)):
+            kind = rng.random()
+            if kind < 0.1:
+                # table row without sentence punctuation
+                parts.append(' '.join(f"{rng.randint(1, 99999):,}.{rng.randint(0, 99):02d}" for _ in range(rng.randint(20, 120))))
+            elif kind < 0.2:
+                parts.append(' '.join(rng.choice(_WORDS).upper() for _ in range(rng.randint(1, 5))))
+            else:
+                words = [rng.choice(_WORDS) for _ in range(rng.randint(3, 45))]
+                parts.append(' '.join(words).capitalize() + rng.choice('..!?'))
+        pages.append(rng.choice([' ', '\n', '  \n']).join(parts))
+    return pages
+
+
+def _time(fn, pages, chunk_size, chunk_overlap, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for page in pages:
+            fn(page, chunk_size, chunk_overlap)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DRHP sentence chunker.")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = make_synthetic_pages(args.pages)
+    total_chars = sum(len(p) for p in pages)
+    print(f"{len(pages)} synthetic pages, {total_chars / 1e6:.1f}M characters")
+
+    for chunk_size, chunk_overlap in [(1000, 200), (500, 100), (2000, 400)]:
+        for page in pages:
+            expected = _split_text_into_chunks_legacy(page, chunk_size, chunk_overlap)
+            actual = _split_text_into_chunks(page, chunk_size, chunk_overlap)
+            if expected != actual:
+                print(f"MISMATCH for chunk_size={chunk_size}, chunk_overlap={chunk_overlap}")
+                return 1
+
+        legacy = _time(_split_text_into_chunks_legacy, pages, chunk_size, chunk_overlap, args.repeat)
+        current = _time(_split_text_into_chunks, pages, chunk_size, chunk_overlap, args.repeat)
+        print(f"chunk_size={chunk_size:<5} overlap={chunk_overlap:<4} "
+              f"legacy {len(pages) / legacy:9.0f} pages/s | "
+              f"current {len(pages) / current:9.0f} pages/s | "
+              f"speedup {legacy / current:.2f}x (outputs identical)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,140 +6,406 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import PyPDF2
-from typing import List
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import groupby
 import re
 import os
 from Utilities.utils import *
 
 
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+def _split_sentences(text: str) -> List[str]:
+    sentences = _SENTENCE_BOUNDARY.split(text.strip())
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def _sentence_offsets(sentences: List[str]) -> Tuple[List[int], List[int]]:
+    starts = []
+    ends = []
+    offset = 0
+    for sentence in sentences:
+        starts.append(offset)
+        offset += len(sentence)
+        ends.append(offset)
+        offset += 1
+    return starts, ends
+
+
+def _chunk_windows(
+    starts: List[int],
+    ends: List[int],
+    chunk_size: int,
+    chunk_overlap: int
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Greedy sentence packing over a single buffer of sentences joined by one space.
+
+    starts/ends are the offsets of each sentence in that buffer, so the length
+    of sentences[a:b] joined is ends[b-1] - starts[a]. Both lists are sorted,
+    which lets chunk ends and overlap starts be found with a binary search.
+
+    Yields:
+        (overlap_start, start, end) sentence indexes per chunk - the chunk text
+        is sentences[overlap_start:end], where [overlap_start, start) are the
+        trailing sentences of the previous chunk that fit in chunk_overlap
+    """
+    i = 0
+    prev = None
+    while i < len(starts):
+        # add sentences while the joined chunk fits in chunk_size
+        end = bisect_right(ends, starts[i] + chunk_size, i)
+        # If we couldn't fit even one sentence, add it anyway to avoid infinite loop
+        if end == i:
+            end = i + 1
+
+        overlap_start = i
+        if prev is not None:
+            # complete sentences from the previous chunk, each costing its length + 1
+            prev_start, prev_end = prev
+            overlap_start = bisect_left(starts, ends[prev_end - 1] + 1 - chunk_overlap, prev_start, prev_end)
+
+        yield overlap_start, i, end
+        prev = (i, end)
+        i = end
+
+
 def _split_text_into_chunks(
     text: str,
     chunk_size: int = 1000,
     chunk_overlap: int = 200
 ) -> List[str]:
-    
-    # Split text into sentences
-    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
-    sentences = [s.strip() for s in sentences if s.strip()]
+    """
+    Split text into chunks of complete sentences with sentence-level overlap.
+
+    Sentences are split once; chunks (including their overlap) are then slices
+    of one space-joined buffer, so there is no re-splitting per chunk.
+    """
+    sentences = _split_sentences(text)
     
     if not sentences:
         return []
     
     if len(sentences) == 1:
         return sentences
-    
-    chunks = []
-    i = 0
-    
-    while i < len(sentences):
-        # Build a chunk by adding complete sentences
-        chunk_sentences = []
-        chunk_length = 0
-        
-        while i < len(sentences):
-            sentence = sentences[i]
-            sentence_length = len(sentence)
-            
-            # Add sentence if it fits in the chunk size
-            if chunk_length + sentence_length + (1 if chunk_sentences else 0) <= chunk_size:
-                chunk_sentences.append(sentence)
-                chunk_length += sentence_length + (1 if len(chunk_sentences) > 1 else 0)
-                i += 1
-            else:
-                break
-        
-        # If we couldn't fit even one sentence, add it anyway to avoid infinite loop
-        if not chunk_sentences:
-            chunk_sentences.append(sentences[i])
-            i += 1
-        
-        chunks.append(' '.join(chunk_sentences))
-    
-    # Add overlap between chunks (complete sentences from previous chunk)
-    if len(chunks) > 1:
-        overlapped_chunks = [chunks[0]]
-        
-        for idx in range(1, len(chunks)):
-            prev_chunk = chunks[idx - 1]
-            curr_chunk = chunks[idx]
-            
-            # Split previous chunk into sentences to add overlap
-            prev_sentences = re.split(r'(?<=[.!?])\s+', prev_chunk.strip())
-            prev_sentences = [s.strip() for s in prev_sentences if s.strip()]
-            
-            # Calculate how many sentences from previous chunk to overlap
-            overlap_sentences = []
-            overlap_length = 0
-            
-            for sent in reversed(prev_sentences):
-                if overlap_length + len(sent) + 1 <= chunk_overlap:
-                    overlap_sentences.insert(0, sent)
-                    overlap_length += len(sent) + 1
-                else:
-                    break
-            
-            # Create overlapped chunk
-            if overlap_sentences:
-                overlapped_chunk = ' '.join(overlap_sentences) + ' ' + curr_chunk
-            else:
-                overlapped_chunk = curr_chunk
-            
-            overlapped_chunks.append(overlapped_chunk)
-        
-        return overlapped_chunks
-    
-    return chunks
 
+    buffer = ' '.join(sentences)
 
-def extract_and_chunk_pdf(
-    folder_path: str,
+    starts, ends = _sentence_offsets(sentences)
+
+    return [
+        buffer[starts[overlap_start]:ends[end - 1]]
+        for overlap_start, _, end in _chunk_windows(starts, ends, chunk_size, chunk_overlap)
+    ]
+
+
+def _iter_document_chunks(
+    pages: Iterable[Tuple[int, str]],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> Iterator[Tuple[str, int, int]]:
+    """
+    Chunk a whole document, streaming sentences across page boundaries.
+
+    A page that does not end on sentence punctuation carries its last sentence
+    over to the next page, so sentences are not cut at page breaks. Packing
+    and overlap follow _split_text_into_chunks; only the sentences of the
+    current and previous chunk are kept in memory.
+
+    Args:
+        pages: (page_num, text) in page order for one document
+
+    Yields:
+        (chunk_text, start_page, end_page)
+    """
+    pending = []    # (sentence, start_page, end_page)
+    prev = None     # (start, end) of the previous chunk inside pending
+    carry = None    # unfinished last sentence of the previous page
+
+    def drain(final):
+        nonlocal pending, prev
+        while True:
+            i = prev[1] if prev else 0
+            if i >= len(pending):
+                return
+
+            starts, ends = _sentence_offsets([sentence for sentence, _, _ in pending])
+            end = bisect_right(ends, starts[i] + chunk_size, i)
+            if end == i:
+                end = i + 1
+            elif end == len(pending) and not final:
+                # the next sentence may still fit, wait for more text
+                return
+
+            overlap_start = i
+            if prev is not None:
+                overlap_start = bisect_left(starts, ends[prev[1] - 1] + 1 - chunk_overlap, prev[0], prev[1])
+
+            yield (
+                ' '.join(sentence for sentence, _, _ in pending[overlap_start:end]),
+                pending[overlap_start][1],
+                pending[end - 1][2]
+            )
+
+            # only this chunk's sentences can be overlapped by the next one
+            pending = pending[i:]
+            prev = (0, end - i)
+
+    for page_num, text in pages:
+        sentences = _split_sentences(text)
+        if not sentences:
+            continue
+
+        entries = [(sentence, page_num, page_num) for sentence in sentences]
+        if carry is not None:
+            entries[0] = (carry[0] + ' ' + entries[0][0], carry[1], page_num)
+            carry = None
+
+        if not text.strip().endswith(('.', '!', '?')):
+            carry = entries.pop()
+
+        pending.extend(entries)
+        yield from drain(final=False)
+
+    if carry is not None:
+        pending.append(carry)
+    yield from drain(final=True)
+
+
+def chunk_pages(
+    pages: Iterable[Dict],
     chunk_size: int = 1000,
     chunk_overlap: int = 200,
     by_page: bool = True
-) -> List:
-    all_chunks = []
-    
+) -> Iterator[Dict]:
+    """
+    Chunk extracted page records ({'file_name', 'page', 'text'}) in file/page order.
+
+    by_page=True chunks every page on its own. by_page=False chunks each
+    document as one text stream; those chunks also carry 'start_page' and
+    'end_page' ('page' is the start page).
+    """
+    if by_page:
+        for page in pages:
+            page_chunks = _split_text_into_chunks(page['text'], chunk_size, chunk_overlap)
+
+            for chunk_idx, chunk_text in enumerate(page_chunks):
+                yield {
+                    'text': chunk_text,
+                    'page': page['page'],
+                    'file_name': page['file_name'],
+                    'chunk_index': chunk_idx
+                }
+        return
+
+    for file_name, file_pages in groupby(pages, key=lambda page: page['file_name']):
+        document_chunks = _iter_document_chunks(
+            ((page['page'], page['text']) for page in file_pages), chunk_size, chunk_overlap
+        )
+
+        for chunk_idx, (chunk_text, start_page, end_page) in enumerate(document_chunks):
+            yield {
+                'text': chunk_text,
+                'page': start_page,
+                'start_page': start_page,
+                'end_page': end_page,
+                'file_name': file_name,
+                'chunk_index': chunk_idx
+            }
+
+
+def _count_pages(pdf_path: str) -> int:
+    with open(pdf_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def _extract_page_range(task: Tuple[str, int, int]) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Extract text for pages [start, end) of one PDF.
+    Runs inside worker processes, so it must stay a top-level function.
+
+    Returns:
+        List of (page_num, text, error) - text is None when the page failed
+    """
+    pdf_path, start, end = task
+    results = []
+
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+
+            for page_num in range(start, min(end, len(pdf_reader.pages))):
+                try:
+                    results.append((page_num, pdf_reader.pages[page_num].extract_text() or '', None))
+                except Exception as e:
+                    results.append((page_num, None, str(e)))
+
+    except Exception as e:
+        # the whole range is lost if the file can't be opened
+        results.extend((page_num, None, str(e)) for page_num in range(start, end))
+
+    return results
+
+
+def extract_pdf_pages(
+    pdf_files: List[Path],
+    workers: int = 1,
+    pages_per_task: int = 50
+) -> Iterator[Dict]:
+    """
+    Extract page text from PDFs, optionally with a process pool.
+
+    Work is split across files and across page ranges inside a file, but pages
+    are always yielded in (file order, page order), so the output is the same
+    for any number of workers.
+
+    Args:
+        pdf_files: PDF paths in processing order
+        workers: Number of worker processes (1 = extract in this process)
+        pages_per_task: Pages handed to a worker at a time
+
+    Yields:
+        {'file_name', 'page', 'text', 'error'} per page - 'text' is None and
+        'error' is set when extraction failed for that page
+    """
+    tasks = []
+    for pdf_file in pdf_files:
+        try:
+            page_count = _count_pages(str(pdf_file))
+        except Exception as e:
+            yield {'file_name': pdf_file.name, 'page': None, 'text': None, 'error': str(e)}
+            continue
+
+        for start in range(0, page_count, pages_per_task):
+            tasks.append((pdf_file, start, min(start + pages_per_task, page_count)))
+
+    def records(task, results):
+        for page_num, text, error in results:
+            yield {'file_name': task[0].name, 'page': page_num, 'text': text, 'error': error}
+
+    str_tasks = [(str(path), start, end) for path, start, end in tasks]
+
+    if workers is None or workers <= 1:
+        for task, str_task in zip(tasks, str_tasks):
+            yield from records(task, _extract_page_range(str_task))
+        return
+
+    # futures are drained in submission order, which keeps the output deterministic;
+    # at most workers * 2 ranges are in flight so extracted text does not pile up
+    # ahead of a slow consumer (callers on Windows must run this under
+    # `if __name__ == "__main__":`)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task, str_task in zip(tasks, str_tasks):
+            pending.append((task, executor.submit(_extract_page_range, str_task)))
+            if len(pending) >= workers * 2:
+                done_task, future = pending.popleft()
+                yield from records(done_task, future.result())
+        while pending:
+            done_task, future = pending.popleft()
+            yield from records(done_task, future.result())
+
+
+def iter_pdf_chunks(
+    folder_path: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    by_page: bool = True,
+    workers: int = 1,
+    pages_per_task: int = 50,
+    errors: Optional[List[Dict]] = None
+) -> Iterator[Dict]:
+    """
+    Stream chunks for every PDF in a folder, one page at a time.
+
+    Yields the same {'text', 'page', 'file_name', 'chunk_index'} dicts as
+    extract_and_chunk_pdf, without holding the whole corpus in memory.
+    See extract_and_chunk_pdf for the arguments.
+    """
     if not os.path.isdir(folder_path):
         print(f"Error: Folder '{folder_path}' not found or is not a directory.")
-        return all_chunks
+        return
     
     # Get all PDF files in the folder
-    pdf_files = list(Path(folder_path).glob('*.pdf'))
+    pdf_files = sorted(Path(folder_path).glob('*.pdf'))
     
     if not pdf_files:
         print(f"No PDF files found in '{folder_path}'")
-        return all_chunks
+        return
     
     print(f"Found {len(pdf_files)} PDF file(s)")
+
+    yield from iter_file_chunks(pdf_files, chunk_size, chunk_overlap, by_page, workers, pages_per_task, errors)
+
+
+def iter_file_chunks(
+    pdf_files: List[Path],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    by_page: bool = True,
+    workers: int = 1,
+    pages_per_task: int = 50,
+    errors: Optional[List[Dict]] = None
+) -> Iterator[Dict]:
+    """Stream chunks for the given PDF files, in the order given."""
+    failed_pages = 0
+
+    def extracted_pages():
+        nonlocal failed_pages
+        current_file = None
+
+        for page in extract_pdf_pages(pdf_files, workers, pages_per_task):
+            if page['file_name'] != current_file:
+                current_file = page['file_name']
+                print(f"Processing: {current_file}")
+
+            if page['error'] is not None:
+                failed_pages += 1
+                where = f"page {page['page']}" if page['page'] is not None else "file"
+                print(f"Error processing {page['file_name']} ({where}): {page['error']}")
+                if errors is not None:
+                    errors.append({'file_name': page['file_name'], 'page': page['page'], 'error': page['error']})
+                continue
+
+            yield page
+
+    # Extract all pages and chunk with page tracking
+    yield from chunk_pages(extracted_pages(), chunk_size, chunk_overlap, by_page)
     
-    # Process each PDF file
-    for pdf_file in pdf_files:
-        file_name = pdf_file.name
-        print(f"Processing: {file_name}")
-        
-        try:
-            with open(str(pdf_file), 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Extract all pages and chunk with page tracking
-                for page_num, page in enumerate(pdf_reader.pages):
-                    text = page.extract_text()
-                    page_chunks = _split_text_into_chunks(text, chunk_size, chunk_overlap)
-                    
-                    for chunk_idx, chunk_text in enumerate(page_chunks):
-                        all_chunks.append({
-                            'text': chunk_text,
-                            'page': page_num,
-                            'file_name': file_name,
-                            'chunk_index': chunk_idx
-                        })
-        
-        except Exception as e:
-            print(f"Error processing {file_name}: {str(e)}")
-            continue
-    
+    if failed_pages:
+        print(f"Pages that could not be extracted: {failed_pages}")
+
+
+def extract_and_chunk_pdf(
+    folder_path: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    by_page: bool = True,
+    workers: int = 1,
+    pages_per_task: int = 50,
+    errors: Optional[List[Dict]] = None
+) -> List:
+    """
+    Extract and chunk every PDF in a folder.
+
+    Args:
+        by_page: Chunk every page on its own (default) or, when False, chunk
+            each document across page boundaries (see chunk_pages)
+        workers: Worker processes for text extraction (1 = serial)
+        pages_per_task: Pages per worker task when workers > 1
+        errors: Optional list that receives {'file_name', 'page', 'error'}
+            for every page (or file) that could not be extracted
+    """
+    all_chunks = list(iter_pdf_chunks(
+        folder_path, chunk_size, chunk_overlap, by_page, workers, pages_per_task, errors
+    ))
+
     print(f"Total chunks created: {len(all_chunks)}")
     return all_chunks
 
 
-# extract_and_chunk_pdf(PDF_FILE_PATH)
\ No newline at end of file
+# extract_and_chunk_pdf(PDF_FILE_PATH)
@@ -0,0 +1,96 @@
+"""
+Per-page vs cross-page chunking report.
+
+Extracts a DRHP folder once, chunks it with by_page=True and by_page=False and
+compares chunk count, small tail chunks, estimated index size and (with
+--embed) embedding time on the same corpus.
+
+Usage:
+    python chunking_mode_report.py                      # PDF_FILE_PATH from c_e_utils
+    python chunking_mode_report.py path/to/DRHP --embed
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+from c_e_utils import PDF_FILE_PATH, get_embedding_model
+from chunking_dhrp import extract_pdf_pages, chunk_pages
+
+
+# chunks shorter than this are mostly page tails / headers
+SMALL_CHUNK_CHARS = 200
+
+# hnswlib default M=16: layer-0 neighbour list of 2*M int32 ids per vector
+HNSW_LINK_BYTES = 2 * 16 * 4
+
+
+def estimate_index_bytes(chunks: List[Dict], dim: int) -> int:
+    """float32 vectors + HNSW links + stored document text."""
+    text_bytes = sum(len(chunk['text'].encode('utf-8')) for chunk in chunks)
+    return len(chunks) * (dim * 4 + HNSW_LINK_BYTES) + text_bytes
+
+
+def summarize(chunks: List[Dict], dim: int) -> Dict:
+    lengths = [len(chunk['text']) for chunk in chunks]
+    return {
+        'chunks': len(chunks),
+        'avg_chars': sum(lengths) / len(lengths) if lengths else 0,
+        'small_chunks': sum(1 for n in lengths if n < SMALL_CHUNK_CHARS),
+        'cross_page_chunks': sum(1 for c in chunks if c.get('start_page', c['page']) != c.get('end_page', c['page'])),
+        'index_mb': estimate_index_bytes(chunks, dim) / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-page and cross-page chunking on a DRHP folder.")
+    parser.add_argument("folder", nargs="?", default=PDF_FILE_PATH)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--embed", action="store_true", help="also time embedding every chunk")
+    parser.add_argument("--dim", type=int, default=768, help="embedding size used for the index estimate")
+    args = parser.parse_args()
+
+    pdf_files = sorted(Path(args.folder).glob('*.pdf'))
+    if not pdf_files:
+        print(f"No PDF files found in '{args.folder}'")
+        return 1
+
+    print(f"Extracting {len(pdf_files)} PDF file(s)...")
+    pages = [page for page in extract_pdf_pages(pdf_files, args.workers) if page['error'] is None]
+    print(f"{len(pages)} pages extracted")
+
+    embedding_model = get_embedding_model() if args.embed else None
+
+    rows = []
+    for label, by_page in [('per-page', True), ('cross-page', False)]:
+        chunks = list(chunk_pages(pages, args.chunk_size, args.chunk_overlap, by_page))
+        row = summarize(chunks, args.dim)
+        row['mode'] = label
+
+        if embedding_model is not None:
+            started = time.perf_counter()
+            embedding_model.encode([chunk['text'] for chunk in chunks])
+            row['embed_s'] = time.perf_counter() - started
+        rows.append(row)
+
+    print()
+    print(f"{'mode':<12}{'chunks':>9}{'avg chars':>11}{'< ' + str(SMALL_CHUNK_CHARS) + ' chars':>12}"
+          f"{'cross-page':>12}{'index MB':>10}{'embed s':>10}")
+    for row in rows:
+        embed = f"{row['embed_s']:.1f}" if 'embed_s' in row else '-'
+        print(f"{row['mode']:<12}{row['chunks']:>9}{row['avg_chars']:>11.0f}{row['small_chunks']:>12}"
+              f"{row['cross_page_chunks']:>12}{row['index_mb']:>10.1f}{embed:>10}")
+
+    per_page, cross_page = rows
+    if per_page['chunks']:
+        print(f"\ncross-page mode: {1 - cross_page['chunks'] / per_page['chunks']:.1%} fewer chunks, "
+              f"{1 - cross_page['index_mb'] / per_page['index_mb']:.1%} smaller index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Builds and incrementally syncs the compressed vector index.
+
+With IPO_CHECKER_VECTOR_COMPRESSION=pca:<dim> or truncate:<dim>, the ingest
+calls sync_compressed_index after updating the full collection. It mirrors
+the full collection into a reduced-dimension collection (vectors and
+metadata, no documents) and a float16 store of the full vectors used for
+exact re-ranking (Utilities.vector_compression). Only chunks added or
+removed since the last sync are touched; PCA is fitted once on a sample and
+refitted only on request.
+
+Usage:
+    python compressed_index.py                   # spec from IPO_CHECKER_VECTOR_COMPRESSION
+    python compressed_index.py pca:256 --refit
+"""
+
+import sys
+import random
+import argparse
+from typing import Dict, List
+
+import numpy as np
+
+from c_e_utils import (VECTOR_COMPRESSION, COLLECTION_NAME, compressed_collection_name, compressor_path,
+                       get_chroma_client, get_rerank_store)
+from Utilities.vector_compression import VectorCompressor
+
+
+# vectors read from / written to chroma per call
+SYNC_BATCH_SIZE = 2000
+
+# vectors used to fit PCA
+PCA_SAMPLE_SIZE = 20000
+
+
+def _batches(ids: List[str], size: int = SYNC_BATCH_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def sync_compressed_index(collection, spec: str = VECTOR_COMPRESSION, refit: bool = False) -> Dict[str, int]:
+    """
+    Bring the compressed collection and the re-rank store in line with `collection`.
+
+    Returns:
+        {'added': n, 'removed': n, 'total': n}
+    """
+    compressor_file = compressor_path(spec)
+    compressor = VectorCompressor(spec)
+    if compressor.kind == "none":
+        raise ValueError("Vector compression is off (IPO_CHECKER_VECTOR_COMPRESSION=none)")
+    if not refit and compressor_file.exists():
+        compressor = VectorCompressor.load(compressor_file)
+
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    client = get_chroma_client()
+    name = compressed_collection_name(spec)
+
+    source_ids = collection.get(include=[])["ids"]
+    if compressor.needs_fit and not source_ids:
+        print("The collection is empty, nothing to fit the compressor on")
+        return {"added": 0, "removed": 0, "total": 0}
+    if compressor.needs_fit:
+        sample = random.Random(0).sample(source_ids, min(PCA_SAMPLE_SIZE, len(source_ids)))
+        vectors = np.concatenate([
+            np.asarray(collection.get(ids=ids, include=["embeddings"])["embeddings"], dtype=np.float32)
+            for ids in _batches(sample)
+        ])
+        print(f"Fitting {spec} on {len(sample)} vectors")
+        compressor.fit(vectors)
+        # vectors projected with the old components are no longer comparable
+        if name in [c if isinstance(c, str) else c.name for c in client.list_collections()]:
+            client.delete_collection(name)
+
+    compressed_collection = client.get_or_create_collection(
+        name=name,
+        metadata={"hnsw:space": space, "description": f"{spec} compressed copy of {COLLECTION_NAME}"}
+    )
+    rerank_store = get_rerank_store()
+
+    source = set(source_ids)
+    compressed = set(compressed_collection.get(include=[])["ids"])
+    stored_full = rerank_store.ids()
+    to_add = sorted((source - compressed) | (source - stored_full))
+    to_remove = sorted(compressed - source)
+
+    for ids in _batches(to_add):
+        stored = collection.get(ids=ids, include=["embeddings", "metadatas"])
+        vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+        compressed_collection.upsert(
+            ids=stored["ids"],
+            embeddings=compressor.transform(vectors).tolist(),
+            metadatas=stored["metadatas"]
+        )
+        rerank_store.upsert(stored["ids"], vectors)
+        print(f"  compressed {len(stored['ids'])} vectors")
+
+    for ids in _batches(to_remove):
+        compressed_collection.delete(ids=ids)
+    # full vectors of chunks that left the collection
+    rerank_store.delete(sorted(stored_full - source))
+
+    compressor.save(compressor_file)
+    summary = {"added": len(to_add), "removed": len(to_remove), "total": compressed_collection.count()}
+    print(f"Compressed index {name}: added {summary['added']}, removed {summary['removed']}, "
+          f"total {summary['total']}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build / sync the compressed vector index.")
+    parser.add_argument("spec", nargs="?", default=VECTOR_COMPRESSION, help="pca:<dim> or truncate:<dim>")
+    parser.add_argument("--refit", action="store_true", help="refit PCA and rebuild the compressed collection")
+    args = parser.parse_args()
+
+    collection = get_chroma_client().get_collection(COLLECTION_NAME)
+    sync_compressed_index(collection, args.spec, args.refit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
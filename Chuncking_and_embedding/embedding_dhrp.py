@@ -1,38 +1,291 @@
-from c_e_utils import PDF_FILE_PATH,embedding_model,chroma_client,COLLECTION_NAME
-from chunking_dhrp import extract_and_chunk_pdf
+import json
+import time
+import hashlib
+from pathlib import Path
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
 
+from c_e_utils import (PDF_FILE_PATH, INGEST_MANIFEST_PATH, COLLECTION_NAME, VECTOR_COMPRESSION, company_key,
+                       get_chroma_client, get_embedding_model, get_lexical_index)
+from chunking_dhrp import iter_file_chunks
+from batch_encoder import EMBED_BATCH_TOKENS, encode_by_token_budget
+from compressed_index import sync_compressed_index
 
-#Creating chuncks from PDH
-created_chunks = extract_and_chunk_pdf(PDF_FILE_PATH)
 
-chunks = [chunk['text'] for chunk in created_chunks]
-print('Chunks extracted')
+# chunks embedded and upserted together; bounds peak memory of the ingest
+BATCH_SIZE = 256
 
-metadatas = [{'source' : chunk['file_name'], 'page': chunk['page']} for chunk in created_chunks]
-print('Metadata extracted')
+# ids chroma accepts in one delete / get / update call
+DELETE_BATCH_SIZE = 5000
 
-ids = [str(i) for i in range(len(created_chunks))]
-print('IDs created')
+# per-file record of what is in the collection: file hash, mtime, size, company and chunk ids,
+# plus the file currently being ingested so a crashed run can resume mid-file
+MANIFEST_PATH = INGEST_MANIFEST_PATH
 
 
-sentence_embeddings = embedding_model.encode(chunks)
-print('Embeddings created')
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
 
-dhrp_collection = chroma_client.get_or_create_collection(
-    name=COLLECTION_NAME,
-    metadata={"description": "Embeddings of DHRP documents"}
-)
-print('Collection created or retrieved')
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
 
 
-dhrp_collection.add(
-    embeddings=sentence_embeddings,
-    documents=chunks,
-    metadatas=metadatas,
-    ids=ids
-)
+def chunk_id(file_hash: str, chunk: Dict) -> str:
+    """
+    Stable id for a chunk: hash of the file name and content, its position in
+    the file and its text. Adding, removing or reordering other PDFs never
+    changes it, and byte-identical copies under another name get their own ids.
+    """
+    key = f"{chunk['file_name']}:{file_hash}:{chunk['page']}:{chunk['chunk_index']}:{chunk['text']}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
 
-print('Chunks added to ChromaDB collection')
-print(f"Total documents in the collection: {dhrp_collection.count()}")
-print('Process completed successfully.')
\ No newline at end of file
+
+def load_manifest(manifest_path: Path = MANIFEST_PATH) -> Dict:
+    if not Path(manifest_path).exists():
+        return {'files': {}, 'in_progress': None}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest_path: Path, manifest: Dict) -> None:
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    # replace is atomic, a crash never leaves a half-written manifest
+    tmp_path.replace(manifest_path)
+
+
+def _delete_ids(collection, lexical_index, ids: List[str]) -> None:
+    for batch in batched(ids, DELETE_BATCH_SIZE):
+        collection.delete(ids=batch)
+        lexical_index.delete(batch)
+
+
+def _backfill_entry(collection, lexical_index, entry: Dict, file_name: str) -> None:
+    """
+    Brings chunks indexed by an older ingest up to date without re-embedding:
+    adds the company metadata field and copies the chunks into the BM25 index.
+    """
+    company = company_key(file_name)
+    for ids in batched(entry['chunk_ids'], DELETE_BATCH_SIZE):
+        stored = collection.get(ids=ids, include=['documents', 'metadatas'])
+        metadatas = [dict(metadata, company=company) for metadata in stored['metadatas']]
+        if 'company' not in entry:
+            collection.update(ids=stored['ids'], metadatas=metadatas)
+        lexical_index.upsert(stored['ids'], stored['documents'], metadatas)
+    entry['company'] = company
+    entry['lexical'] = True
+
+
+def chunk_metadata(chunk: Dict) -> Dict:
+    metadata = {
+        'source': chunk['file_name'],
+        'company': company_key(chunk['file_name']),
+        'page': chunk['page'],
+        'chunk_index': chunk['chunk_index']
+    }
+    # document-level chunks can span pages
+    if 'start_page' in chunk:
+        metadata['start_page'] = chunk['start_page']
+        metadata['end_page'] = chunk['end_page']
+    return metadata
+
+
+def _ingest_file(pdf_file: Path, file_hash: str, collection, lexical_index, embedding_model, manifest: Dict,
+                 manifest_path: Path, batch_size: int, workers: int, by_page: bool,
+                 max_batch_tokens: int = EMBED_BATCH_TOKENS) -> List[str]:
+    """
+    Embeds one file in batches, checkpointing committed chunk ids after every
+    upsert (Chroma and the BM25 index are written before the checkpoint).
+    Each upsert batch is encoded in length-sorted, token-budgeted sub-batches
+    (see batch_encoder).
+    """
+    in_progress = manifest.get('in_progress') or {}
+    if (in_progress.get('file_name') == pdf_file.name and in_progress.get('sha256') == file_hash
+            and in_progress.get('by_page', True) == by_page):
+        chunk_ids = in_progress['chunk_ids']
+        print(f'Resuming {pdf_file.name} after {len(chunk_ids)} committed chunks')
+    else:
+        if in_progress.get('chunk_ids'):
+            # partial upserts of an interrupted run that can't be resumed any more
+            _delete_ids(collection, lexical_index, in_progress['chunk_ids'])
+        chunk_ids = []
+        manifest['in_progress'] = {
+            'file_name': pdf_file.name, 'sha256': file_hash, 'by_page': by_page, 'chunk_ids': chunk_ids
+        }
+
+    errors = []
+    # chunk order within a file is deterministic, so committed chunks can be skipped
+    chunks = islice(iter_file_chunks([pdf_file], by_page=by_page, workers=workers, errors=errors),
+                    len(chunk_ids), None)
+
+    started = time.perf_counter()
+    upserted = 0
+    encode_seconds = 0.0
+    encoded_tokens = 0
+
+    for batch in batched(chunks, batch_size):
+        documents = [chunk['text'] for chunk in batch]
+        metadatas = [chunk_metadata(chunk) for chunk in batch]
+        ids = [chunk_id(file_hash, chunk) for chunk in batch]
+
+        embeddings, encode_stats = encode_by_token_budget(embedding_model, documents, max_batch_tokens)
+        encode_seconds += encode_stats['seconds']
+        encoded_tokens += encode_stats['tokens']
+
+        collection.upsert(
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas,
+            ids=ids
+        )
+        lexical_index.upsert(ids, documents, metadatas)
+
+        chunk_ids.extend(ids)
+        upserted += len(batch)
+        _save_manifest(manifest_path, manifest)
+
+        elapsed = time.perf_counter() - started
+        print(f"  {pdf_file.name}: committed {len(chunk_ids)} chunks ({upserted / elapsed:.1f} chunks/s, "
+              f"encoding {encoded_tokens / encode_seconds:,.0f} tokens/s, "
+              f"padding x{encode_stats['padding_ratio']:.2f}) - page {batch[-1]['page']}")
+
+    if any(error['page'] is None for error in errors):
+        # the file could not be opened at all, leave it for the next run
+        raise RuntimeError(f"Could not read {pdf_file.name}: {errors[0]['error']}")
+
+    return chunk_ids
+
+
+def ingest(
+    folder_path: str = PDF_FILE_PATH,
+    batch_size: int = BATCH_SIZE,
+    workers: int = 1,
+    by_page: bool = True,
+    manifest_path: Path = MANIFEST_PATH
+) -> Dict[str, List[str]]:
+    """
+    Incremental, idempotent ingest of a DRHP folder.
+
+    Files are compared with the manifest: unchanged files (same size and
+    mtime, or same content hash) are skipped, new or changed files are
+    streamed pages -> chunks -> embedding batches -> Chroma upserts, and the
+    chunks of changed or removed files are deleted. Re-indexing after adding
+    one prospectus only costs that one file. Switching by_page (per-page vs
+    cross-page chunking, see chunking_dhrp.chunk_pages) re-indexes every file.
+    Every chunk carries a `company` field (Utilities.company_utils.company_key
+    of its file name) that the query side filters on, and is also written to
+    the BM25 index (Utilities.lexical_index) used by hybrid retrieval. With
+    IPO_CHECKER_VECTOR_COMPRESSION set, the compressed index is synced last
+    (see compressed_index).
+
+    Returns:
+        {'added': [...], 'updated': [...], 'removed': [...], 'unchanged': [...]} file names
+    """
+    embedding_model = get_embedding_model()
+
+    dhrp_collection = get_chroma_client().get_or_create_collection(
+        name=COLLECTION_NAME,
+        metadata={"description": "Embeddings of DHRP documents"}
+    )
+    print('Collection created or retrieved')
+    lexical_index = get_lexical_index()
+
+    manifest_path = Path(manifest_path)
+    is_new_manifest = not manifest_path.exists()
+    manifest = load_manifest(manifest_path)
+
+    if is_new_manifest and dhrp_collection.count():
+        # collections built before the manifest used positional ids "0".."n-1"
+        legacy_count = dhrp_collection.count()
+        print(f'Removing {legacy_count} chunks with legacy positional ids')
+        _delete_ids(dhrp_collection, lexical_index, [str(i) for i in range(legacy_count)])
+
+    if manifest['files'] and not lexical_index.count():
+        # BM25 index missing or deleted, rebuild it from the stored chunks
+        for entry in manifest['files'].values():
+            entry['lexical'] = False
+
+    pdf_files = {path.name: path for path in sorted(Path(folder_path).glob('*.pdf'))}
+    summary = {'added': [], 'updated': [], 'removed': [], 'unchanged': []}
+
+    for file_name in sorted(set(manifest['files']) - set(pdf_files)):
+        print(f'Removing chunks of deleted file: {file_name}')
+        _delete_ids(dhrp_collection, lexical_index, manifest['files'][file_name]['chunk_ids'])
+        del manifest['files'][file_name]
+        _save_manifest(manifest_path, manifest)
+        summary['removed'].append(file_name)
+
+    for file_name, pdf_file in pdf_files.items():
+        stat = pdf_file.stat()
+        entry = manifest['files'].get(file_name)
+
+        if entry and entry.get('by_page', True) != by_page:
+            # chunking mode changed, the stored chunks no longer match
+            entry = dict(entry, sha256=None)
+
+        unchanged = entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size and entry['sha256']
+        if not unchanged:
+            file_hash = file_sha256(pdf_file)
+            if entry and entry['sha256'] == file_hash:
+                # touched but not modified, just refresh the stat info
+                entry.update(mtime=stat.st_mtime, size=stat.st_size)
+                unchanged = True
+
+        if unchanged:
+            if 'company' not in entry or not entry.get('lexical'):
+                print(f'Updating metadata / BM25 index for chunks of {file_name}')
+                _backfill_entry(dhrp_collection, lexical_index, entry, file_name)
+            _save_manifest(manifest_path, manifest)
+            summary['unchanged'].append(file_name)
+            continue
+
+        print(f"{'Updating' if entry else 'Adding'}: {file_name}")
+        try:
+            chunk_ids = _ingest_file(pdf_file, file_hash, dhrp_collection, lexical_index, embedding_model,
+                                     manifest, manifest_path, batch_size, workers, by_page)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            continue
+
+        if entry:
+            stale_ids = sorted(set(entry['chunk_ids']) - set(chunk_ids))
+            _delete_ids(dhrp_collection, lexical_index, stale_ids)
+
+        manifest['files'][file_name] = {
+            'sha256': file_hash,
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'by_page': by_page,
+            'company': company_key(file_name),
+            'lexical': True,
+            'chunk_ids': chunk_ids
+        }
+        manifest['in_progress'] = None
+        _save_manifest(manifest_path, manifest)
+        summary['updated' if entry else 'added'].append(file_name)
+
+    print(f"Added {len(summary['added'])}, updated {len(summary['updated'])}, "
+          f"removed {len(summary['removed'])}, unchanged {len(summary['unchanged'])} file(s)")
+    print(f"Total documents in the collection: {dhrp_collection.count()}")
+
+    if VECTOR_COMPRESSION != "none":
+        sync_compressed_index(dhrp_collection, VECTOR_COMPRESSION)
+    return summary
+
+
+if __name__ == "__main__":
+    ingest()
+    print('Process completed successfully.')
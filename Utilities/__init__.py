@@ -1,2 +1,8 @@
 # Utilities package
 from .utils import *
+from . import utils as _utils
+
+
+def __getattr__(name):
+    # lazy singletons (embedding_model, dhrp_doc_collection, ...) live in utils
+    return getattr(_utils, name)
@@ -0,0 +1,120 @@
+## company scoping for DRHP retrieval
+#
+# Every chunk is stored with a `company` metadata field derived from its PDF
+# file name, and queries filter on it, so one prospectus never leaks into the
+# context of another and search cost depends on that company's chunks only.
+import re
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .utils import INGEST_MANIFEST_PATH, get_dhrp_collection
+
+
+# words that name the document rather than the company
+_NOISE_WORDS = {
+    'drhp', 'rhp', 'draft', 'red', 'herring', 'prospectus', 'ipo',
+    'ltd', 'limited', 'pvt', 'private', 'pdf'
+}
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def company_key(name: str) -> str:
+    """
+    Normalized company id for a DRHP file name or a user-typed IPO name, e.g.
+    'Tata_Capital_Limited_DRHP.pdf' and 'Tata Capital Ltd.' both give 'tata_capital'.
+    """
+    stem = name[:-4] if name.lower().endswith('.pdf') else name
+    words = [word for word in _WORD.findall(stem.lower()) if word not in _NOISE_WORDS]
+    return '_'.join(words)
+
+
+def known_companies(manifest_path: Path = INGEST_MANIFEST_PATH) -> Dict[str, List[str]]:
+    """
+    Company keys in the vector store (from the ingest manifest) mapped to their source files.
+
+    A store built before the manifest existed falls back to the `company`
+    metadata of its chunks, read once per process (see _legacy_store).
+    """
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return _collection_companies()
+    with open(manifest_path, 'r') as f:
+        files = json.load(f).get('files', {})
+
+    companies = {}
+    for file_name, entry in files.items():
+        companies.setdefault(entry.get('company') or company_key(file_name), []).append(file_name)
+    return companies
+
+
+@lru_cache(maxsize=1)
+def _legacy_store() -> Tuple[Dict[str, List[str]], int]:
+    """
+    Companies tagged in the collection's chunk metadata, and its chunk count.
+
+    Only used when there is no ingest manifest; read once per process so
+    requests don't scan the corpus (errors are not cached, the next call retries).
+    """
+    collection = get_dhrp_collection()
+    companies = {}
+    # chunks ingested before company tagging have no `company` field and are skipped
+    for metadata in collection.get(include=["metadatas"])["metadatas"]:
+        company = (metadata or {}).get('company')
+        if company and metadata.get('source') not in companies.setdefault(company, []):
+            companies[company].append(metadata.get('source'))
+    return companies, collection.count()
+
+
+def _collection_companies() -> Dict[str, List[str]]:
+    try:
+        return _legacy_store()[0]
+    except Exception:
+        return {}
+
+
+def _has_untagged_chunks() -> bool:
+    try:
+        return _legacy_store()[1] > 0
+    except Exception:
+        return False
+
+
+def resolve_company(ipo_name: str, manifest_path: Path = INGEST_MANIFEST_PATH) -> Optional[str]:
+    """
+    Map a user-typed IPO name to the company key of an ingested prospectus.
+
+    An exact key match wins; otherwise a single company whose key contains
+    the typed name (or is contained in it) is accepted. A collection indexed
+    before company tagging (chunks but no manifest and no `company` field)
+    gives None, and retrieval searches every DRHP. Such a store has
+    positional chunk ids, so the next ingest rebuilds it: every PDF is
+    re-chunked and re-embedded with the company field.
+
+    Raises:
+        ValueError: If no prospectus, or more than one, matches
+    """
+    key = company_key(ipo_name or '')
+    if not key:
+        raise ValueError("Enter an IPO name.")
+
+    companies = known_companies(manifest_path)
+    if not companies and _has_untagged_chunks():
+        print(f"DRHP chunks carry no company field yet, searching all documents for '{ipo_name}'. "
+              f"Re-ingest the PDFs with Chuncking_and_embedding/embedding_dhrp.py (re-embeds the whole "
+              f"corpus) to enable company scoping.")
+        return None
+    if not companies:
+        raise ValueError("No DRHP documents are ingested yet, run Chuncking_and_embedding/embedding_dhrp.py first.")
+
+    if key in companies:
+        return key
+
+    matches = sorted(company for company in companies if key in company or company in key)
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        raise ValueError(f"'{ipo_name}' matches several prospectuses: {', '.join(matches)}")
+    raise ValueError(f"No DRHP found for '{ipo_name}'. Available: {', '.join(sorted(companies))}")
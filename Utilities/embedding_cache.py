@@ -0,0 +1,155 @@
+## on-disk cache for query embeddings
+import os
+import time
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "query_embeddings.sqlite"
+
+
+def normalize_text(text):
+    # same question with different spacing/unicode form should hit the same entry
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    SQLite backed embedding cache keyed by (model name, normalized text).
+
+    Entries are evicted least-recently-used first once `max_entries` is
+    exceeded. `hits` and `misses` count lookups since the cache was opened.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=10000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # retrieval runs in worker threads, access is serialised by the lock
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                   model TEXT NOT NULL,
+                   text TEXT NOT NULL,
+                   dim INTEGER NOT NULL,
+                   vector BLOB NOT NULL,
+                   last_access REAL NOT NULL,
+                   PRIMARY KEY (model, text)
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+        self._conn.commit()
+
+    def get_many(self, model, texts):
+        """Returns {position: vector} for every text found in the cache."""
+        keys = [normalize_text(t) for t in texts]
+        found = {}
+        with self._lock:
+            rows = {}
+            unique_keys = list(dict.fromkeys(keys))
+            # stay under sqlite's bound-parameter limit
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                cursor = self._conn.execute(
+                    f"SELECT text, vector FROM embeddings WHERE model = ? AND text IN ({placeholders})",
+                    [model, *batch],
+                )
+                rows.update(cursor.fetchall())
+
+            for i, key in enumerate(keys):
+                if key in rows:
+                    found[i] = np.frombuffer(rows[key], dtype=np.float32).copy()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+            if rows:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model = ? AND text = ?",
+                    [(now, model, key) for key in rows],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, model, texts, vectors):
+        now = time.time()
+        records = []
+        for text, vector in zip(texts, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            records.append((model, normalize_text(text), vector.shape[-1], vector.tobytes(), now))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text, dim, vector, last_access) VALUES (?, ?, ?, ?, ?)",
+                records,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """DELETE FROM embeddings WHERE rowid IN (
+                       SELECT rowid FROM embeddings ORDER BY last_access ASC LIMIT ?
+                   )""",
+                (overflow,),
+            )
+
+    def encode(self, model_name, encoder, texts):
+        """
+        Returns embeddings for `texts` (same order), calling `encoder` with one
+        batch containing only the texts that were not cached.
+        """
+        texts = list(texts)
+        cached = self.get_many(model_name, texts)
+        missing = [i for i in range(len(texts)) if i not in cached]
+
+        if missing:
+            new_vectors = encoder([texts[i] for i in missing])
+            self.put_many(model_name, [texts[i] for i in missing], new_vectors)
+            for i, vector in zip(missing, new_vectors):
+                cached[i] = np.asarray(vector, dtype=np.float32)
+
+        return np.stack([cached[i] for i in range(len(texts))]) if texts else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self):
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cache_from_env():
+    """Builds the query embedding cache from env, None when disabled (EMBEDDING_CACHE=0)."""
+    if os.getenv("EMBEDDING_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    return EmbeddingCache(
+        path=os.getenv("EMBEDDING_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+        max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000")),
+    )
@@ -0,0 +1,122 @@
+## BM25 lexical index over the DRHP chunks
+#
+# Dense retrieval misses questions that hinge on exact terms ("SFIO",
+# "Offer For Sale", "debt-to-equity"). This index is a SQLite FTS5 table
+# (an inverted index ranked with BM25) holding the same chunk ids as the
+# Chroma collection. It is filled by the ingest and fused with the dense
+# results in tools/query_vector_database_tool.py (retrieval mode "hybrid").
+import re
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+
+# dropped from queries: they match almost every chunk and only slow the OR query down
+_STOPWORDS = {
+    'a', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'by', 'can', 'does', 'do', 'for', 'from',
+    'has', 'have', 'how', 'if', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'such', 'that', 'the',
+    'their', 'there', 'these', 'this', 'to', 'was', 'were', 'what', 'when', 'which', 'who', 'will',
+    'with', 'company', 'companys'
+}
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def query_terms(text: str) -> List[str]:
+    """Distinct lower-case query tokens without stopwords, in order of appearance."""
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        if token not in _STOPWORDS and token not in terms:
+            terms.append(token)
+    return terms
+
+
+class LexicalIndex:
+    """
+    Persistent BM25 index of chunk texts, keyed by the Chroma chunk ids.
+
+    search() returns results shaped like a single-query Chroma result
+    (ids / documents / metadatas / distances, each wrapped in a list), with
+    distances holding FTS5 bm25 scores (lower is better).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS chunks ('
+                'rowid INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, company TEXT, metadata TEXT)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS chunks_company ON chunks(company)')
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(text, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def _delete_locked(self, ids: Sequence[str]) -> None:
+        for chunk_id in ids:
+            row = self._conn.execute('SELECT rowid FROM chunks WHERE id = ?', (chunk_id,)).fetchone()
+            if row:
+                self._conn.execute('DELETE FROM chunks_fts WHERE rowid = ?', row)
+                self._conn.execute('DELETE FROM chunks WHERE rowid = ?', row)
+
+    def upsert(self, ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[Dict]) -> None:
+        with self._lock, self._conn:
+            self._delete_locked(ids)
+            for chunk_id, document, metadata in zip(ids, documents, metadatas):
+                cursor = self._conn.execute(
+                    'INSERT INTO chunks (id, company, metadata) VALUES (?, ?, ?)',
+                    (chunk_id, metadata.get('company'), json.dumps(metadata))
+                )
+                self._conn.execute('INSERT INTO chunks_fts (rowid, text) VALUES (?, ?)',
+                                   (cursor.lastrowid, document))
+
+    def delete(self, ids: Sequence[str]) -> None:
+        with self._lock, self._conn:
+            self._delete_locked(ids)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM chunks').fetchone()[0]
+
+    def search(self, query: str, top_k: int = 5, company: Optional[str] = None) -> Dict[str, List]:
+        """BM25 top_k chunks for a free-text query, optionally restricted to one company."""
+        results = {'ids': [[]], 'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+        terms = query_terms(query)
+        if not terms:
+            return results
+
+        # quoted so FTS5 treats every token literally (no operators / column filters)
+        match = ' OR '.join('"' + term.replace('"', '""') + '"' for term in terms)
+        sql = ('SELECT c.id, f.text, c.metadata, bm25(chunks_fts) AS score '
+               'FROM chunks_fts AS f JOIN chunks AS c ON c.rowid = f.rowid '
+               'WHERE chunks_fts MATCH ?')
+        params = [match]
+        if company:
+            sql += ' AND c.company = ?'
+            params.append(company)
+        sql += ' ORDER BY score LIMIT ?'
+        params.append(top_k)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        for chunk_id, document, metadata, score in rows:
+            results['ids'][0].append(chunk_id)
+            results['documents'][0].append(document)
+            results['metadatas'][0].append(json.loads(metadata))
+            results['distances'][0].append(score)
+        return results
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM chunks_fts')
+            self._conn.execute('DELETE FROM chunks')
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
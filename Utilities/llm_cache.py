@@ -0,0 +1,187 @@
+## opt-in response cache for call_llm
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "llm_responses.sqlite"
+
+
+def make_cache_key(model, messages, params=None):
+    """Content hash of everything that determines the completion."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryLRUBackend:
+    """In-process LRU store of key -> (expires_at, value)."""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def set(self, key, expires_at, value):
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SQLiteBackend:
+    """On-disk store of key -> (expires_at, value), LRU eviction past max_entries."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=10000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   key TEXT PRIMARY KEY,
+                   value TEXT NOT NULL,
+                   expires_at REAL NOT NULL,
+                   last_access REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+            return row
+
+    def set(self, key, expires_at, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    """DELETE FROM responses WHERE key IN (
+                           SELECT key FROM responses ORDER BY last_access ASC LIMIT ?
+                       )""",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM completions.
+
+    The key is a hash of (model, messages, sampling params); entries older
+    than `ttl` seconds are treated as misses. Any object with get/set/delete/
+    clear and the (expires_at, value) contract of the backends above can be
+    plugged in as `backend`.
+    """
+
+    def __init__(self, backend=None, ttl=24 * 60 * 60):
+        self.backend = backend if backend is not None else MemoryLRUBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model, messages, params=None):
+        key = make_cache_key(model, messages, params)
+        item = self.backend.get(key)
+        if item is not None:
+            expires_at, value = item
+            if expires_at >= time.time():
+                self.hits += 1
+                return value
+            self.backend.delete(key)
+        self.misses += 1
+        return None
+
+    def set(self, model, messages, value, params=None):
+        if value is None:
+            return
+        key = make_cache_key(model, messages, params)
+        self.backend.set(key, time.time() + self.ttl, value)
+
+    def clear(self):
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def cache_from_env():
+    """
+    Builds the response cache from env. LLM_CACHE=memory or LLM_CACHE=sqlite
+    turns it on (off by default); LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES and
+    LLM_CACHE_PATH tune it.
+    """
+    kind = os.getenv("LLM_CACHE", "").strip().lower()
+    if kind in ("", "0", "off", "false", "none"):
+        return None
+
+    max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    if kind == "memory":
+        backend = MemoryLRUBackend(max_entries=max_entries)
+    elif kind == "sqlite":
+        backend = SQLiteBackend(path=os.getenv("LLM_CACHE_PATH", str(DEFAULT_CACHE_PATH)), max_entries=max_entries)
+    else:
+        raise ValueError(f"Invalid LLM_CACHE backend: {kind}. Use 'memory' or 'sqlite'.")
+
+    return LLMResponseCache(backend=backend, ttl=float(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60))))
@@ -1,35 +1,379 @@
 ##query_vector_database_tool (RAG)
+#
+# Heavy objects (OpenAI client, SentenceTransformer, Chroma client/collection)
+# are created on first use through the get_* functions below, so importing
+# this module stays cheap. The old module attributes (openrouter,
+# embedding_model, chroma_client, dhrp_doc_collection, query_embedding_cache,
+# llm_response_cache) still work and resolve lazily through __getattr__.
 import os
-from openai import OpenAI
+import asyncio
+import random
+import threading
+from pathlib import Path
 from dotenv import load_dotenv
 
+from .llm_cache import cache_from_env as llm_cache_from_env
+
 load_dotenv(override=True)
 
 
 open_router_key = os.getenv("OPENROUTER_API_KEY", "")
-BASE_URL = "https://openrouter.ai/api/v1"
+# override to point at a local OpenAI-compatible mock server when testing
+BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 MODEL = "google/gemini-3-flash-preview"
-openrouter = OpenAI(api_key=open_router_key, base_url=BASE_URL)
 
-def call_llm(MODEL, system_message, user_message):
-    messages = [
+## vector DB settings for DHRP documents
+DB_PATH = os.getenv("IPO_CHECKER_DB_PATH", str(Path(__file__).resolve().parent.parent / "ChromaDB"))
+COLLECTION_NAME = os.getenv("IPO_CHECKER_COLLECTION", 'dhrp_embeddings_collection')
+EMBEDDING_MODEL = os.getenv("IPO_CHECKER_EMBEDDING_MODEL", 'multi-qa-mpnet-base-dot-v1')
+# how the encoder runs: "torch" (fp32), "torch-int8" (dynamic int8 Linear layers),
+# "onnx" (ONNX Runtime) or "onnx-int8" (ONNX Runtime, dynamically quantized int8)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+# onnx-int8 kernel target: "avx2" runs anywhere, "avx512_vnni" is faster on recent Xeons
+EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")
+# exported / quantized ONNX models are built once and kept here
+ENCODER_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "encoders"
+# written by the ingest, lists every indexed DRHP file and its company
+INGEST_MANIFEST_PATH = Path(DB_PATH) / 'ingest_manifest.json'
+# BM25 index over the same chunks, kept next to the ChromaDB directory
+LEXICAL_INDEX_PATH = os.getenv("IPO_CHECKER_LEXICAL_INDEX_PATH",
+                               str(Path(DB_PATH).parent / "LexicalIndex" / "dhrp_bm25.sqlite"))
+# "dense" (Chroma only) or "hybrid" (Chroma + BM25 fused with reciprocal rank fusion)
+RETRIEVAL_MODE = os.getenv("IPO_CHECKER_RETRIEVAL_MODE", "dense")
+# "none", "pca:<dim>" or "truncate:<dim>": search a reduced-dimension copy of the
+# collection and re-rank RERANK_CANDIDATES hits with the full vectors (see vector_compression)
+VECTOR_COMPRESSION = os.getenv("IPO_CHECKER_VECTOR_COMPRESSION", "none")
+COMPRESSED_INDEX_DIR = Path(DB_PATH).parent / "CompressedIndex"
+RERANK_CANDIDATES = int(os.getenv("IPO_CHECKER_RERANK_CANDIDATES", "50"))
+
+
+_singletons = {}
+# re-entrant: factories build their dependencies through _get_singleton too
+# (get_dhrp_collection -> get_chroma_client)
+_singletons_lock = threading.RLock()
+
+
+def _get_singleton(name, factory):
+    # double-checked so concurrent first calls build the object only once
+    instance = _singletons.get(name)
+    if instance is None:
+        with _singletons_lock:
+            instance = _singletons.get(name)
+            if instance is None:
+                instance = factory()
+                _singletons[name] = instance
+    return instance
+
+
+def get_openrouter():
+    def factory():
+        from openai import OpenAI
+        return OpenAI(api_key=open_router_key, base_url=BASE_URL)
+    return _get_singleton("openrouter", factory)
+
+
+def load_embedding_model(backend=None):
+    """
+    SentenceTransformer for EMBEDDING_MODEL on the given backend (default
+    EMBEDDING_BACKEND). All backends expose the same encode(); int8 backends
+    give slightly different vectors, see tools/encoder_benchmark.py.
+    """
+    backend = backend or EMBEDDING_BACKEND
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Invalid embedding backend: {backend}. Use one of {EMBEDDING_BACKENDS}.")
+
+    if backend.startswith("onnx"):
+        try:
+            import optimum.onnxruntime  # noqa: F401
+        except ImportError as e:
+            raise ImportError(f"The {backend} embedding backend needs optimum[onnxruntime]: "
+                              f"pip install 'optimum[onnxruntime]'") from e
+
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(EMBEDDING_MODEL)
+
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+        transformer = model[0]
+        transformer.auto_model = torch.quantization.quantize_dynamic(
+            transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return model
+
+    if backend == "onnx":
+        return SentenceTransformer(EMBEDDING_MODEL, backend="onnx")
+
+    export_dir = ENCODER_CACHE_DIR / f"{EMBEDDING_MODEL.replace('/', '__')}-onnx"
+    file_name = f"onnx/model_qint8_{EMBEDDING_ONNX_QUANTIZATION}.onnx"
+    if not (export_dir / file_name).exists():
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        print(f"Quantizing {EMBEDDING_MODEL} to int8 ONNX ({EMBEDDING_ONNX_QUANTIZATION}), done once...")
+        model = SentenceTransformer(EMBEDDING_MODEL, backend="onnx")
+        model.save(str(export_dir))
+        export_dynamic_quantized_onnx_model(model, EMBEDDING_ONNX_QUANTIZATION, str(export_dir))
+    return SentenceTransformer(str(export_dir), backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def embedding_cache_key(backend=None):
+    # query embeddings cached under the fp32 model name stay valid for the torch backend
+    backend = backend or EMBEDDING_BACKEND
+    return EMBEDDING_MODEL if backend == "torch" else f"{EMBEDDING_MODEL}@{backend}"
+
+
+def get_embedding_model():
+    return _get_singleton("embedding_model", load_embedding_model)
+
+
+def get_chroma_client():
+    def factory():
+        import chromadb
+        return chromadb.PersistentClient(path=DB_PATH)
+    return _get_singleton("chroma_client", factory)
+
+
+def get_dhrp_collection():
+    return _get_singleton("dhrp_doc_collection", lambda: get_chroma_client().get_collection(COLLECTION_NAME))
+
+
+def get_lexical_index():
+    def factory():
+        from .lexical_index import LexicalIndex
+        return LexicalIndex(LEXICAL_INDEX_PATH)
+    return _get_singleton("lexical_index", factory)
+
+
+def compressed_collection_name(spec=None):
+    return f"{COLLECTION_NAME}_{(spec or VECTOR_COMPRESSION).replace(':', '')}"
+
+
+def compressor_path(spec=None):
+    return COMPRESSED_INDEX_DIR / f"{compressed_collection_name(spec)}.npz"
+
+
+def get_vector_compressor():
+    # None when compression is off or its index has not been built by the ingest yet
+    def factory():
+        if VECTOR_COMPRESSION == "none":
+            return False
+        path = compressor_path()
+        if not path.exists():
+            print(f"No compressed index for {VECTOR_COMPRESSION} yet, searching the full collection")
+            return False
+        from .vector_compression import VectorCompressor
+        return VectorCompressor.load(path)
+    return _get_singleton("vector_compressor", factory) or None
+
+
+def get_compressed_collection():
+    return _get_singleton("compressed_collection",
+                          lambda: get_chroma_client().get_collection(compressed_collection_name()))
+
+
+def get_rerank_store():
+    def factory():
+        from .vector_compression import RerankStore
+        return RerankStore(COMPRESSED_INDEX_DIR / "full_vectors_f16.sqlite")
+    return _get_singleton("rerank_store", factory)
+
+
+def get_query_embedding_cache():
+    # query embeddings are reused across runs (eval questions never change)
+    def factory():
+        from .embedding_cache import cache_from_env
+        # cache the "disabled" answer too, the singleton map treats None as missing
+        return cache_from_env() or False
+    return _get_singleton("query_embedding_cache", factory) or None
+
+
+def get_llm_response_cache():
+    # opt-in response cache, see llm_cache.cache_from_env (LLM_CACHE=memory|sqlite)
+    return _get_singleton("llm_response_cache", lambda: llm_cache_from_env() or False) or None
+
+
+_LAZY_ATTRIBUTES = {
+    "openrouter": get_openrouter,
+    "embedding_model": get_embedding_model,
+    "chroma_client": get_chroma_client,
+    "dhrp_doc_collection": get_dhrp_collection,
+    "query_embedding_cache": get_query_embedding_cache,
+    "lexical_index": get_lexical_index,
+    "llm_response_cache": get_llm_response_cache,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# limits for the async client used by the concurrent RAG pipeline
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "6"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def _build_messages(system_message, user_message):
+    return [
         {"role": "system", "content": system_message},
         {"role": "user", "content": user_message},
     ]
-    response = openrouter.chat.completions.create(model=MODEL, messages=messages)
-    return response.choices[0].message.content
 
 
 
-## vector DB utilities for DHRP documents
-import chromadb
-from sentence_transformers import SentenceTransformer
-from pathlib import Path
-DB_PATH = r"C:\Users\rauna\projects\My Projects\IPO_Checker\ChromaDB"
-chroma_client = chromadb.PersistentClient(path=DB_PATH)
-COLLECTION_NAME = 'dhrp_embeddings_collection'
-EMBEDDING_MODEL = 'multi-qa-mpnet-base-dot-v1'
-embedding_model = SentenceTransformer(EMBEDDING_MODEL)
-dhrp_doc_collection = chroma_client.get_collection(COLLECTION_NAME)
 
+def call_llm(MODEL, system_message, user_message, cache=None, **params):
+    """
+    Single chat completion. Extra keyword arguments (temperature, ...) are
+    passed to the API and are part of the cache key. `cache` defaults to the
+    env-configured llm_response_cache; pass False to bypass it.
+    """
+    cache = get_llm_response_cache() if cache is None else cache
+    messages = _build_messages(system_message, user_message)
+
+    if cache:
+        cached = cache.get(MODEL, messages, params)
+        if cached is not None:
+            return cached
+
+    response = get_openrouter().chat.completions.create(model=MODEL, messages=messages, **params)
+    content = response.choices[0].message.content
+
+    if cache:
+        cache.set(MODEL, messages, content, params)
+    return content
+
+
+class AsyncLLMClient:
+    """
+    Bounded async OpenRouter client.
+
+    At most `max_concurrency` completions are in flight at once. Requests that
+    fail with 429/5xx or a connection error are retried with exponential
+    backoff (plus jitter), honouring a Retry-After header when one is sent.
+    """
+
+    def __init__(self, api_key=None, base_url=None, max_concurrency=None,
+                 max_retries=None, backoff_base=0.5, backoff_max=20.0, cache=None):
+        from openai import AsyncOpenAI
+
+        # retries are handled here so the SDK's own retry loop is disabled
+        self._client = AsyncOpenAI(
+            api_key=api_key if api_key is not None else open_router_key,
+            base_url=base_url or BASE_URL,
+            max_retries=0,
+        )
+        self.max_concurrency = max_concurrency or LLM_MAX_CONCURRENCY
+        self.max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.cache = get_llm_response_cache() if cache is None else cache
+
+    def _backoff_delay(self, attempt, error=None):
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        delay = self.backoff_base * (2 ** attempt)
+        return min(delay, self.backoff_max) * (0.5 + random.random() / 2)
+
+    async def call_llm(self, MODEL, system_message, user_message, **params):
+        from openai import APIStatusError, APIConnectionError
+
+        messages = _build_messages(system_message, user_message)
+
+        if self.cache:
+            cached = self.cache.get(MODEL, messages, params)
+            if cached is not None:
+                return cached
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self._client.chat.completions.create(
+                        model=MODEL, messages=messages, **params
+                    )
+                content = response.choices[0].message.content
+                if self.cache:
+                    self.cache.set(MODEL, messages, content, params)
+                return content
+            except APIStatusError as e:
+                if e.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    raise
+                error = e
+            except APIConnectionError as e:
+                if attempt >= self.max_retries:
+                    raise
+                error = e
+
+            delay = self._backoff_delay(attempt, error)
+            print(f"LLM call failed ({error}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def stream_llm(self, MODEL, system_message, user_message, **params):
+        """
+        Async generator of completion text deltas (stream=True).
+
+        Failures before the first token are retried like call_llm; once text
+        has been yielded an error is raised, since a retry would repeat it.
+        A cached response is yielded as a single delta, and the full streamed
+        text is stored in the cache.
+        """
+        from openai import APIStatusError, APIConnectionError
+
+        messages = _build_messages(system_message, user_message)
+
+        if self.cache:
+            cached = self.cache.get(MODEL, messages, params)
+            if cached is not None:
+                yield cached
+                return
+
+        attempt = 0
+        while True:
+            parts = []
+            try:
+                async with self._semaphore:
+                    stream = await self._client.chat.completions.create(
+                        model=MODEL, messages=messages, stream=True, **params
+                    )
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+                if self.cache:
+                    self.cache.set(MODEL, messages, "".join(parts), params)
+                return
+            except APIStatusError as e:
+                if parts or e.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    raise
+                error = e
+            except APIConnectionError as e:
+                if parts or attempt >= self.max_retries:
+                    raise
+                error = e
+
+            delay = self._backoff_delay(attempt, error)
+            print(f"LLM stream failed ({error}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        await self._client.close()
+
+    async def __aenter__(self):
+        return self
 
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
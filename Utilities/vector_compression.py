@@ -0,0 +1,160 @@
+## compressed vector index with exact re-ranking
+#
+# The Chroma HNSW index keeps every chunk as a 768-dim float32 vector in RAM.
+# With IPO_CHECKER_VECTOR_COMPRESSION set (e.g. "pca:256" or "truncate:256")
+# the ingest also maintains a second, smaller collection holding reduced
+# vectors, plus a float16 store of the full vectors. Queries search the small
+# index for a candidate set and re-rank it with the full vectors, see
+# tools/query_vector_database_tool.py and tools/compression_benchmark.py.
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+COMPRESSION_KINDS = ("none", "pca", "truncate")
+
+
+def parse_spec(spec: str) -> Tuple[str, Optional[int]]:
+    """'none', 'pca:<dim>' or 'truncate:<dim>' -> (kind, dim)."""
+    kind, _, dim = (spec or "none").partition(":")
+    if kind not in COMPRESSION_KINDS:
+        raise ValueError(f"Invalid vector compression: {spec}. Use 'none', 'pca:<dim>' or 'truncate:<dim>'.")
+    if kind == "none":
+        return kind, None
+    if not dim.isdigit() or int(dim) <= 0:
+        raise ValueError(f"Vector compression {spec} needs a positive dimension, e.g. {kind}:256")
+    return kind, int(dim)
+
+
+class VectorCompressor:
+    """
+    Reduces embeddings to `dim` dimensions.
+
+    "truncate" keeps the first dims (Matryoshka-style, no fitting). "pca"
+    projects on the top principal directions of the uncentered vectors, so
+    dot products and distances between projected vectors approximate the
+    original ones and queries are projected the same way as documents.
+    """
+
+    def __init__(self, spec: str, components: Optional[np.ndarray] = None):
+        self.spec = spec
+        self.kind, self.dim = parse_spec(spec)
+        self.components = components
+
+    @property
+    def needs_fit(self) -> bool:
+        return self.kind == "pca" and self.components is None
+
+    def fit(self, vectors: np.ndarray) -> "VectorCompressor":
+        if self.kind == "pca":
+            vectors = np.asarray(vectors, dtype=np.float32)
+            if self.dim > min(vectors.shape):
+                raise ValueError(f"pca:{self.dim} needs at least {self.dim} vectors of dimension >= {self.dim}")
+            _, _, vt = np.linalg.svd(vectors, full_matrices=False)
+            self.components = vt[:self.dim].T.astype(np.float32)
+        return self
+
+    def transform(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.kind == "truncate":
+            return np.ascontiguousarray(vectors[:, :self.dim])
+        if self.kind == "pca":
+            if self.components is None:
+                raise RuntimeError("PCA compressor is not fitted")
+            return vectors @ self.components
+        return vectors
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, spec=np.array(self.spec),
+                     components=self.components if self.components is not None else np.zeros((0, 0)))
+
+    @classmethod
+    def load(cls, path: Path) -> "VectorCompressor":
+        with np.load(path) as data:
+            components = data["components"]
+            return cls(str(data["spec"]), components if components.size else None)
+
+
+class RerankStore:
+    """
+    Full-dimension vectors stored as float16 blobs in SQLite, keyed by chunk id.
+
+    Half the size of the float32 vectors, read only for a query's candidate
+    set, so re-ranking stays exact up to float16 rounding.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (id TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def upsert(self, ids: Sequence[str], vectors) -> None:
+        vectors = np.asarray(vectors, dtype=np.float16)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (id, vector) VALUES (?, ?)",
+                [(chunk_id, vector.tobytes()) for chunk_id, vector in zip(ids, vectors)]
+            )
+
+    def delete(self, ids: Sequence[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM vectors WHERE id = ?", [(chunk_id,) for chunk_id in ids])
+
+    def get(self, ids: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+        """Found ids (in request order) and their vectors as float32."""
+        if not ids:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = dict(self._conn.execute(
+                f"SELECT id, vector FROM vectors WHERE id IN ({placeholders})", list(ids)
+            ).fetchall())
+        found = [chunk_id for chunk_id in ids if chunk_id in rows]
+        if not found:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        vectors = np.stack([np.frombuffer(rows[chunk_id], dtype=np.float16) for chunk_id in found])
+        return found, vectors.astype(np.float32)
+
+    def ids(self) -> set:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT id FROM vectors")}
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def exact_distances(query, vectors: np.ndarray, space: str = "l2") -> np.ndarray:
+    """Chroma's distance for each vector: squared l2, 1 - dot ("ip") or cosine distance."""
+    query = np.asarray(query, dtype=np.float32)
+    if space == "ip":
+        return 1.0 - vectors @ query
+    if space == "cosine":
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        return 1.0 - (vectors @ query) / np.maximum(norms, 1e-12)
+    difference = vectors - query
+    return np.einsum("ij,ij->i", difference, difference)
+
+
+def rerank(query, candidate_ids: Sequence[str], store: RerankStore, top_k: int,
+           space: str = "l2") -> List[Tuple[str, float]]:
+    """Top_k (id, exact distance) among the candidates, nearest first."""
+    found, vectors = store.get(candidate_ids)
+    if not found:
+        return []
+    distances = exact_distances(query, vectors, space)
+    order = np.argsort(distances, kind="stable")[:top_k]
+    return [(found[i], float(distances[i])) for i in order]
@@ -10,8 +10,17 @@ Usage:
     data = fetch_ipo_data(month=12, year=2025)
 """
 
-from .ipo_fetcher import fetch_ipo_data, get_ipo_data_json
+from .ipo_fetcher import fetch_ipo_data, fetch_ipo_year, fetch_ipo_range, get_ipo_data_json, get_ipo_range_json
+from .driver_pool import DriverPool, get_driver_pool
+from .http_cache import CachedSession, get_http_session
+from .date_parser import DateParser, get_date_parse_stats
+from .models import IPORecord
+from .ipo_store import IPOStore
 
 __version__ = "1.0.0"
 __author__ = "IPO Fetcher"
-__all__ = ["fetch_ipo_data", "get_ipo_data_json"]
+__all__ = [
+    "fetch_ipo_data", "fetch_ipo_year", "fetch_ipo_range", "get_ipo_data_json", "get_ipo_range_json",
+    "DriverPool", "get_driver_pool", "CachedSession", "get_http_session",
+    "DateParser", "get_date_parse_stats", "IPORecord", "IPOStore"
+]
@@ -0,0 +1,116 @@
+"""
+IPO Table Parser Benchmark
+
+Measures rows/sec of every installed table_parser backend on saved
+Chittorgarh pages, and checks that each backend extracts exactly the same
+cells as the original full-page BeautifulSoup('html.parser') walk.
+
+Usage (from the repository root):
+    # save the yearly listing pages as fixtures first
+    python -m fetching_ipo_data_chittor.benchmark_table_parser --save 2024 2025
+
+    # benchmark all fixtures in fetching_ipo_data_chittor/fixtures/
+    python -m fetching_ipo_data_chittor.benchmark_table_parser --repeat 20
+
+Without fixtures a synthetic page shaped like the Chittorgarh listing is used.
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import List
+
+from bs4 import BeautifulSoup
+
+from .ipo_fetcher import HEADERS, _year_url
+from .http_cache import get_http_session
+from .table_parser import BACKENDS, available_backends, extract_table_rows
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+
+def reference_rows(html) -> List[List[str]]:
+    # what _fetch_with_* did before the shared parser: parse the whole page with html.parser
+    table = BeautifulSoup(html, 'html.parser').find('table')
+    return [[cell.get_text(strip=True) for cell in row.find_all('td')] for row in table.find_all('tr')[1:]]
+
+
+def synthetic_page(rows: int = 400, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    body = []
+    for i in range(rows):
+        body.append(
+            '<tr>'
+            f'<td><a href="/ipo/company-{i}/">Company {i} Ltd. IPO</a></td>'
+            f'<td>Mon, Dec {rng.randint(1, 28)}, 2025</td>'
+            f'<td>Wed, Dec {rng.randint(1, 28)}, 2025</td>'
+            f'<td>{"Yet to list" if rng.random() < 0.2 else "Fri, Dec 26, 2025"}</td>'
+            f'<td>{rng.randint(50, 900)}.00 to {rng.randint(900, 1200)}.00</td>'
+            f'<td>{rng.randint(10, 9999):,}.{rng.randint(0, 99):02d}</td>'
+            '<td>BSE, NSE</td>'
+            f'<td>Lead Manager {rng.randint(1, 40)} Capital Ltd.</td>'
+            '</tr>'
+        )
+    filler = '<div class="nav"><ul>' + '<li><a href="#">menu</a></li>' * 2000 + '</ul></div>'
+    return (
+        f'<html><head><title>IPO list</title></head><body>{filler}'
+        '<table><thead><tr><th>Company</th><th>Open</th><th>Close</th><th>Listing</th>'
+        '<th>Price</th><th>Issue Size</th><th>Exchange</th><th>Lead Manager</th></tr></thead>'
+        f'<tbody>{"".join(body)}</tbody></table>{filler}</body></html>'
+    )
+
+
+def save_fixtures(years: List[int]) -> None:
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    for year in years:
+        response = get_http_session().get(_year_url(year), headers=HEADERS, timeout=10)
+        path = FIXTURES_DIR / f'chittorgarh_{year}.html'
+        path.write_bytes(response.content)
+        print(f"Saved {path} ({len(response.content) / 1024:.0f} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IPO table parser backends.")
+    parser.add_argument("--save", type=int, nargs="+", metavar="YEAR", help="download listing pages as fixtures")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixtures(args.save)
+        return 0
+
+    pages = {path.name: path.read_bytes() for path in sorted(FIXTURES_DIR.glob('*.html'))}
+    if not pages:
+        print(f"No fixtures in {FIXTURES_DIR}, using a synthetic page")
+        pages = {'synthetic': synthetic_page().encode('utf-8')}
+
+    backends = available_backends()
+    print(f"Backends: {', '.join(backends)} (not installed: {', '.join(sorted(set(BACKENDS) - set(backends))) or '-'})")
+
+    for name, html in pages.items():
+        expected = reference_rows(html)
+        print(f"\n{name}: {len(html) / 1024:.0f} KB, {len(expected)} rows")
+
+        timings = {'reference (full page, bs4)': lambda: reference_rows(html)}
+        for backend in backends:
+            rows = extract_table_rows(html, backend)
+            if rows != expected:
+                print(f"  {backend}: MISMATCH with the reference rows")
+                return 1
+            timings[backend] = lambda backend=backend: extract_table_rows(html, backend)
+
+        for label, fn in timings.items():
+            best = float('inf')
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - started)
+            print(f"  {label:<28} {len(expected) / best:>12,.0f} rows/s  ({best * 1000:.1f} ms/page)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+
+# Chittorgarh dates: 'Mon, Dec 22, 2025' or, inside a yearly table, 'Mon, Dec 22'
+_DATE_PATTERN = re.compile(r'^([A-Za-z]{3}),\s+([A-Za-z]{3})\s+(\d{1,2})(?:,\s+(\d{4}))?$')
+
+_WEEKDAYS = {'mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun'}
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+
+class DateParser:
+    """
+    Memoized parser for the scraped IPO dates.
+
+    Replaces the strptime-then-fallback approach (which raised an exception
+    for every short-form date) with one regex match, and caches results per
+    (string, default year) since yearly tables repeat the same dates. Strings
+    that cannot be parsed are counted in `failures` instead of being dropped
+    silently.
+    """
+
+    def __init__(self, cache_size: int = 4096):
+        self._cached_parse = lru_cache(maxsize=cache_size)(self._parse_uncached)
+        self.failures: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _parse_uncached(date_str: str, year: int) -> Optional[datetime]:
+        match = _DATE_PATTERN.match(date_str)
+        if not match:
+            return None
+
+        weekday, month_name, day, explicit_year = match.groups()
+        month = _MONTHS.get(month_name.lower())
+        if month is None or weekday.lower() not in _WEEKDAYS:
+            return None
+
+        try:
+            return datetime(int(explicit_year) if explicit_year else year, month, int(day))
+        except ValueError:
+            # e.g. Feb 30
+            return None
+
+    def parse(self, date_str: str, year: int) -> Optional[datetime]:
+        """
+        Parse 'Mon, Dec 22, 2025' (or 'Mon, Dec 22' using `year`) to a datetime.
+
+        Returns:
+            datetime object or None if parsing fails
+        """
+        date_str = date_str.strip()
+
+        if not date_str:
+            return None
+
+        parsed = self._cached_parse(date_str, year)
+        if parsed is None:
+            with self._lock:
+                self.failures[date_str] += 1
+        return parsed
+
+    def stats(self) -> Dict[str, Any]:
+        info = self._cached_parse.cache_info()
+        with self._lock:
+            return {
+                'cache_hits': info.hits,
+                'cache_misses': info.misses,
+                'cache_size': info.currsize,
+                'failures': sum(self.failures.values()),
+                'top_failures': self.failures.most_common(10)
+            }
+
+    def reset(self) -> None:
+        self._cached_parse.cache_clear()
+        with self._lock:
+            self.failures.clear()
+
+
+default_date_parser = DateParser()
+
+
+def get_date_parse_stats() -> Dict[str, Any]:
+    """Cache hit/miss counts and unparseable date strings seen by the fetcher."""
+    return default_date_parser.stats()
@@ -0,0 +1,158 @@
+import atexit
+import threading
+from queue import LifoQueue, Empty
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+def _chrome_options() -> webdriver.ChromeOptions:
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument(f'user-agent={USER_AGENT}')
+    return options
+
+
+def _new_chrome_driver() -> webdriver.Chrome:
+    return webdriver.Chrome(options=_chrome_options())
+
+
+class DriverPool:
+    """
+    Pool of warm headless Chrome sessions shared by fetch calls.
+
+    Launching Chrome dominates fetch latency, so drivers are kept alive and
+    reused. A driver is health-checked before it is handed out, and quit and
+    replaced after `max_pages_per_driver` page loads or once its session died.
+
+    Usage:
+        pool = DriverPool(max_size=2)
+        with pool.driver() as driver:
+            driver.get(url)
+        pool.close()
+    """
+
+    def __init__(
+        self,
+        max_size: int = 2,
+        max_pages_per_driver: int = 25,
+        driver_factory: Callable[[], webdriver.Remote] = _new_chrome_driver,
+        acquire_timeout: Optional[float] = 120
+    ):
+        """
+        Args:
+            max_size (int): Maximum number of Chrome sessions alive at once
+            max_pages_per_driver (int): Page loads after which a driver is recycled
+            driver_factory (callable): Creates a new WebDriver
+            acquire_timeout (float): Seconds to wait for a free driver (None = forever)
+        """
+        self.max_size = max_size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.driver_factory = driver_factory
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = LifoQueue()  # most recently used first, keeps the warmest drivers busy
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._pages: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            # any round trip to the browser fails if the session died
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _quit(self, driver) -> None:
+        with self._lock:
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def _checkout(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except Empty:
+                driver = self.driver_factory()
+                with self._lock:
+                    self._pages[id(driver)] = 0
+                return driver
+
+            if self._is_healthy(driver):
+                return driver
+            self._quit(driver)
+
+    def _checkin(self, driver, broken: bool) -> None:
+        with self._lock:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+
+        if broken or self._closed or pages >= self.max_pages_per_driver:
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def driver(self) -> Iterator[webdriver.Remote]:
+        """Borrow a driver for one page load; it is returned to the pool afterwards."""
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f"No WebDriver available after {self.acquire_timeout}s")
+
+        driver = None
+        broken = False
+        try:
+            driver = self._checkout()
+            yield driver
+        except WebDriverException:
+            # page timeouts are WebDriverExceptions too, only drop drivers that died
+            broken = driver is not None and not self._is_healthy(driver)
+            raise
+        finally:
+            if driver is not None:
+                self._checkin(driver, broken)
+            self._slots.release()
+
+    def close(self) -> None:
+        """Quit every idle driver; drivers in use are quit when they are returned."""
+        self._closed = True
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except Empty:
+                return
+
+    def __enter__(self) -> 'DriverPool':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+_shared_pool: Optional[DriverPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """Process-wide pool used by fetch_ipo_data; Chrome is only started on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            _shared_pool = DriverPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
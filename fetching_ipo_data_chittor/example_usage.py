@@ -5,7 +5,8 @@ This script demonstrates how to use the ipo_fetcher module to fetch IPO data
 from the Chittorgarh website in JSON format.
 """
 
-from fetching_ipo_data_chittor.ipo_fetcher import fetch_ipo_data, get_ipo_data_json
+from fetching_ipo_data_chittor.ipo_fetcher import fetch_ipo_data, fetch_ipo_range, get_ipo_data_json
+from fetching_ipo_data_chittor.ipo_store import IPOStore
 import json
 
 # Example 1: Fetch December 2025 IPO data as dictionary
@@ -32,8 +33,8 @@ print(november_json[:500] + "...")
 print("\n" + "=" * 70)
 print("EXAMPLE 3: Fetch data for multiple months")
 print("=" * 70)
-for month in [10, 11, 12]:
-    data = fetch_ipo_data(month=month, year=2025)
+# the 2025 page is downloaded once and sliced per month
+for data in fetch_ipo_range(start_month=10, start_year=2025, end_month=12, end_year=2025):
     print(f"  {data['month_name']} 2025: {data['total_ipos']} IPOs")
 
 # Example 4: Save to file
@@ -56,9 +57,22 @@ print(f"Book Building IPOs in December: {len(high_price_ipos)}")
 for ipo in high_price_ipos[:2]:
     print(f"  • {ipo['company_name']}: {ipo['price']}")
 
-# Example 6: Error handling with invalid input
+# Example 6: Same filter offline from the local IPO store
 print("\n" + "=" * 70)
-print("EXAMPLE 6: Error handling")
+print("EXAMPLE 6: Filter IPOs from the local store (no scraping)")
+print("=" * 70)
+store = IPOStore()
+if store.query(year=2025, limit=1) == []:
+    store.sync_year(2025)  # scrape once, later runs query the local database
+stored_ipos = store.query(month=12, year=2025)
+high_price_ipos = [ipo for ipo in stored_ipos if 'to' in ipo['price']]
+print(f"Book Building IPOs in December (offline): {len(high_price_ipos)}")
+affordable = store.query(month=12, year=2025, max_price=200)  # numeric filter runs in SQL
+print(f"IPOs in December priced at most Rs 200: {len(affordable)}")
+
+# Example 7: Error handling with invalid input
+print("\n" + "=" * 70)
+print("EXAMPLE 7: Error handling")
 print("=" * 70)
 try:
     invalid_data = fetch_ipo_data(month=13, year=2025)  # Invalid month
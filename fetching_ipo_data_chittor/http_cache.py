@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "http"
+
+# responses younger than this are served without touching the network
+DEFAULT_TTL = int(os.getenv("IPO_HTTP_CACHE_TTL", "300"))
+
+
+class CachedResponse(NamedTuple):
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str]
+    # None = downloaded, 'fresh' = served within the TTL, 'revalidated' = 304 from the server
+    from_cache: Optional[str]
+
+
+class CachedSession:
+    """
+    Pooled, keep-alive requests.Session with an on-disk HTTP cache.
+
+    A cached response younger than `ttl` seconds is returned without a
+    request. Older responses are revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged page costs a 304 instead of a full
+    download.
+
+    Usage:
+        session = CachedSession(ttl=300)
+        response = session.get(url, headers=HEADERS)
+        response.content, response.from_cache
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = None,
+        ttl: int = DEFAULT_TTL,
+        pool_maxsize: int = 10
+    ):
+        """
+        Args:
+            cache_dir (Path): Directory for cached bodies and their validators
+            ttl (int): Freshness lifetime in seconds (0 = always revalidate)
+            pool_maxsize (int): Connections kept alive per host
+        """
+        self.cache_dir = Path(cache_dir or os.getenv("IPO_HTTP_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f'{key}.json', self.cache_dir / f'{key}.body'
+
+    def _load(self, url: str):
+        meta_path, body_path = self._paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return None, None
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            return meta, body_path.read_bytes()
+        except (OSError, ValueError):
+            return None, None
+
+    def _store(self, url: str, meta: Dict, body: Optional[bytes]) -> None:
+        meta_path, body_path = self._paths(url)
+        # write to temp files and rename, readers never see half-written entries
+        if body is not None:
+            tmp_body = body_path.with_suffix('.body.tmp')
+            tmp_body.write_bytes(body)
+            tmp_body.replace(body_path)
+        tmp_meta = meta_path.with_suffix('.json.tmp')
+        with open(tmp_meta, 'w') as f:
+            json.dump(meta, f)
+        tmp_meta.replace(meta_path)
+
+    def get(self, url: str, headers: Dict[str, str] = None, timeout: float = 10,
+            force_refresh: bool = False) -> CachedResponse:
+        """
+        GET through the cache. Raises requests.HTTPError for error responses.
+
+        force_refresh skips the TTL and always asks the server (a cached
+        copy is still revalidated, so an unchanged page costs a 304).
+        """
+        meta, body = self._load(url)
+
+        if not force_refresh and meta is not None and time.time() - meta['fetched_at'] < self.ttl:
+            return CachedResponse(url, meta['status_code'], body, meta['headers'], 'fresh')
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self.session.get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and meta is not None:
+            meta['fetched_at'] = time.time()
+            self._store(url, meta, None)
+            return CachedResponse(url, meta['status_code'], body, meta['headers'], 'revalidated')
+
+        response.raise_for_status()
+
+        kept_headers = {
+            name: response.headers[name]
+            for name in ('Content-Type', 'ETag', 'Last-Modified')
+            if name in response.headers
+        }
+        self._store(url, {
+            'url': url,
+            'status_code': response.status_code,
+            'headers': kept_headers,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time()
+        }, response.content)
+
+        return CachedResponse(url, response.status_code, response.content, kept_headers, None)
+
+    def clear(self) -> None:
+        for path in self.cache_dir.glob('*'):
+            if path.suffix in ('.json', '.body', '.tmp'):
+                path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_shared_session: Optional[CachedSession] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_http_session() -> CachedSession:
+    """Process-wide cached session used by the requests fetcher path."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = CachedSession()
+        return _shared_session
@@ -1,18 +1,146 @@
-import requests
-from bs4 import BeautifulSoup
 import json
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import os
 import time
-from selenium import webdriver
+import threading
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from .driver_pool import DriverPool, get_driver_pool
+from .http_cache import CachedSession, get_http_session
+from .table_parser import DEFAULT_BACKEND, extract_table_rows
+from .date_parser import default_date_parser
+from .models import IPORecord, NOT_LISTED
+
+
+MONTH_NAMES = {
+    1: 'January', 2: 'February', 3: 'March', 4: 'April',
+    5: 'May', 6: 'June', 7: 'July', 8: 'August',
+    9: 'September', 10: 'October', 11: 'November', 12: 'December'
+}
+
+# override to point the fetcher at a local server (e.g. saved pages in tests)
+BASE_URL = os.getenv("CHITTORGARH_BASE_URL", "https://www.chittorgarh.com")
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# a yearly page is downloaded and parsed once, then months are sliced from it
+YEAR_CACHE_TTL = 15 * 60  # seconds
+
+# (fetched_at, records), records kept as IPORecord and turned into dicts per call
+_year_cache: Dict[Tuple[int, bool], Tuple[float, List[IPORecord]]] = {}
+_year_cache_lock = threading.Lock()
+
+
+def _validate_year(year: int) -> None:
+    if year < 2000 or year > 2100:
+        raise ValueError(f"Invalid year: {year}. Year must be between 2000 and 2100.")
+
+
+def _year_url(year: int) -> str:
+    return f"{BASE_URL}/report/ipo-in-india-list-main-board-sme/82/mainboard/?year={year}"
+
+
+
+def fetch_ipo_year(year: int, use_selenium: bool = True, refresh: bool = False, store=None,
+                   as_records: bool = False) -> Dict[str, Any]:
+    """
+    Fetch every IPO listed for a year, parsing the yearly table once.
+
+    Results are kept in memory for YEAR_CACHE_TTL seconds, so asking for
+    several months of the same year downloads the page only once.
+    
+    Args:
+        year (int): Year (e.g., 2025)
+        use_selenium (bool): Whether to use Selenium for JavaScript rendering (default: True)
+        refresh (bool): Ignore the in-memory cache and ask the server again
+            (the requests path bypasses the HTTP cache TTL; Selenium always loads the page)
+        store (IPOStore): Optional local store the fetched IPOs are upserted into
+        as_records (bool): Return IPORecord objects (typed dates, numeric price
+            bounds and issue size) instead of JSON-style dicts
+    
+    Returns:
+        {
+            'year': int,
+            'total_ipos': int,
+            'ipos': [...],                 # same IPO dicts as fetch_ipo_data (or IPORecords)
+            'months': {1: [...], ..., 12: [...]},  # IPOs indexed by close_date month
+            'error': str                   # only present when the fetch failed
+        }
+    """
+    _validate_year(year)
+    
+    key = (year, use_selenium)
+    if not refresh:
+        with _year_cache_lock:
+            cached = _year_cache.get(key)
+        if cached and time.time() - cached[0] < YEAR_CACHE_TTL:
+            if store is not None:
+                store.upsert_ipos(cached[1])
+            return _year_result(year, cached[1], None, as_records)
+    
+    url = _year_url(year)
+    
+    try:
+        if use_selenium:
+            ipos, error = _fetch_with_selenium(url, year)
+        else:
+            ipos, error = _fetch_with_requests(url, year, HEADERS, force_refresh=refresh)
+    except Exception as e:
+        ipos, error = [], f'Failed to fetch data: {str(e)}'
+    
+    if not error:
+        # failures are not cached, the next call retries
+        with _year_cache_lock:
+            _year_cache[key] = (time.time(), ipos)
+        if store is not None:
+            store.upsert_ipos(ipos)
+    
+    return _year_result(year, ipos, error, as_records)
+
+
+def _year_result(year: int, records: List[IPORecord], error: Optional[str], as_records: bool) -> Dict[str, Any]:
+    ipos = records if as_records else [record.to_dict() for record in records]
+    
+    months = {month: [] for month in MONTH_NAMES}
+    for record, ipo in zip(records, ipos):
+        months[record.close_date.month].append(ipo)
+    
+    data = {
+        'year': year,
+        'total_ipos': len(ipos),
+        'ipos': ipos,
+        'months': months
+    }
+    if error:
+        data['error'] = error
+    return data
+
+
+def _month_result(year_data: Dict[str, Any], month: int) -> Dict[str, Any]:
+    ipos = list(year_data['months'][month])
+    result = {
+        'year': year_data['year'],
+        'month': month,
+        'month_name': MONTH_NAMES[month],
+        'total_ipos': len(ipos),
+        'ipos': ipos
+    }
+    if 'error' in year_data:
+        result['error'] = year_data['error']
+    return result
+
 
 def fetch_ipo_data(month: int, year: int, use_selenium: bool = True) -> Dict[str, Any]:
     """
     Fetch IPO details for a specific month and year from Chittorgarh website.
     
+    The month is sliced from fetch_ipo_year, so calls for other months of the
+    same year are served from memory.
+    
     Args:
         month (int): Month number (1-12)
         year (int): Year (e.g., 2025)
@@ -44,199 +172,131 @@ def fetch_ipo_data(month: int, year: int, use_selenium: bool = True) -> Dict[str
     # Validate month and year
     if not (1 <= month <= 12):
         raise ValueError(f"Invalid month: {month}. Month must be between 1 and 12.")
-    if year < 2000 or year > 2100:
-        raise ValueError(f"Invalid year: {year}. Year must be between 2000 and 2100.")
-    
-    month_names = {
-        1: 'January', 2: 'February', 3: 'March', 4: 'April',
-        5: 'May', 6: 'June', 7: 'July', 8: 'August',
-        9: 'September', 10: 'October', 11: 'November', 12: 'December'
-    }
-    
-    # Construct URL
-    url = f"https://www.chittorgarh.com/report/ipo-in-india-list-main-board-sme/82/mainboard/?year={year}"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
-    try:
-        if use_selenium:
-            return _fetch_with_selenium(url, month, year, month_names)
-        else:
-            return _fetch_with_requests(url, month, year, month_names, headers)
+    _validate_year(year)
     
-    except Exception as e:
-        return {
-            'year': year,
-            'month': month,
-            'month_name': month_names[month],
-            'total_ipos': 0,
-            'ipos': [],
-            'error': f'Failed to fetch data: {str(e)}'
-        }
+    return _month_result(fetch_ipo_year(year, use_selenium), month)
 
 
-def _fetch_with_selenium(url: str, month: int, year: int, month_names: Dict) -> Dict[str, Any]:
-    """Fetch data using Selenium to render JavaScript content."""
+def fetch_ipo_range(
+    start_month: int,
+    start_year: int,
+    end_month: int,
+    end_year: int,
+    use_selenium: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Fetch IPO details for every month from start to end (inclusive).
     
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-gpu')
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+    Each year in the range is downloaded once.
     
-    driver = webdriver.Chrome(options=options)
+    Args:
+        start_month (int), start_year (int): First month of the range
+        end_month (int), end_year (int): Last month of the range
+        use_selenium (bool): Whether to use Selenium for JavaScript rendering (default: True)
     
-    try:
-        driver.get(url)
-        
-        # Wait for table to load
-        wait = WebDriverWait(driver, 10)
-        table = wait.until(EC.presence_of_element_located((By.TAG_NAME, 'table')))
-        
-        # Get page source and parse with BeautifulSoup
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # Find the main table
-        table = soup.find('table')
-        
-        if not table:
-            return {
-                'year': year,
-                'month': month,
-                'month_name': month_names[month],
-                'total_ipos': 0,
-                'ipos': [],
-                'error': 'No IPO data table found on the webpage'
-            }
-        
-        ipos = []
-        rows = table.find_all('tr')[1:]  # Skip header row
-        
-        for row in rows:
-            cells = row.find_all('td')
-            
-            if len(cells) >= 8:  # Ensure we have all required columns
-                try:
-                    company_name = cells[0].get_text(strip=True)
-                    open_date_text = cells[1].get_text(strip=True)
-                    close_date_text = cells[2].get_text(strip=True)
-                    list_date_text = cells[3].get_text(strip=True)
-                    price = cells[4].get_text(strip=True)
-                    total_issue = cells[5].get_text(strip=True)
-                    exchange = cells[6].get_text(strip=True)
-                    lead_manager = cells[7].get_text(strip=True) if len(cells) > 7 else ''
-                    
-                    # Parse dates and check if they belong to the specified month
-                    open_date = _parse_date(open_date_text, year)
-                    close_date = _parse_date(close_date_text, year)
-                    list_date = _parse_date(list_date_text, year) if list_date_text and list_date_text != 'Yet to list' else 'Yet to list'
-                    
-                    # Filter by month - check if close_date falls in the specified month
-                    if open_date and close_date:
-                        if close_date.month == month:
-                            ipos.append({
-                                'company_name': company_name,
-                                'open_date': open_date.strftime('%Y-%m-%d'),
-                                'close_date': close_date.strftime('%Y-%m-%d'),
-                                'list_date': list_date.strftime('%Y-%m-%d') if list_date != 'Yet to list' else 'Yet to list',
-                                'price': price,
-                                'total_issue_amount': total_issue,
-                                'exchange': exchange,
-                                'lead_manager': lead_manager
-                            })
-                except (ValueError, AttributeError, IndexError):
-                    # Skip rows with parsing errors
-                    continue
-        
-        return {
-            'year': year,
-            'month': month,
-            'month_name': month_names[month],
-            'total_ipos': len(ipos),
-            'ipos': ipos
-        }
+    Returns:
+        List of fetch_ipo_data results, one per month, in date order
+    """
+    for month in (start_month, end_month):
+        if not (1 <= month <= 12):
+            raise ValueError(f"Invalid month: {month}. Month must be between 1 and 12.")
+    _validate_year(start_year)
+    _validate_year(end_year)
+    if (start_year, start_month) > (end_year, end_month):
+        raise ValueError("Start of the range must not be after its end.")
     
-    finally:
-        driver.quit()
+    results = []
+    for year in range(start_year, end_year + 1):
+        year_data = fetch_ipo_year(year, use_selenium)
+        first = start_month if year == start_year else 1
+        last = end_month if year == end_year else 12
+        results.extend(_month_result(year_data, month) for month in range(first, last + 1))
+    return results
 
 
-def _fetch_with_requests(url: str, month: int, year: int, month_names: Dict, headers: Dict) -> Dict[str, Any]:
-    """Fetch data using requests library."""
-    
-    response = requests.get(url, headers=headers, timeout=10)
-    response.raise_for_status()
-    
-    # Parse HTML
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    # Find the main table containing IPO data
-    table = soup.find('table')
-    
-    if not table:
-        return {
-            'year': year,
-            'month': month,
-            'month_name': month_names[month],
-            'total_ipos': 0,
-            'ipos': [],
-            'error': 'No IPO data table found on the webpage'
-        }
-    
+def _parse_ipo_rows(rows: List[List[str]], year: int) -> List[IPORecord]:
+    """Turn the cell texts of the Chittorgarh IPO table into IPO records (all months)."""
     ipos = []
-    rows = table.find_all('tr')[1:]  # Skip header row
     
-    for row in rows:
-        cells = row.find_all('td')
+    for cells in rows:
         
         if len(cells) >= 8:  # Ensure we have all required columns
             try:
-                company_name = cells[0].get_text(strip=True)
-                open_date_text = cells[1].get_text(strip=True)
-                close_date_text = cells[2].get_text(strip=True)
-                list_date_text = cells[3].get_text(strip=True)
-                price = cells[4].get_text(strip=True)
-                total_issue = cells[5].get_text(strip=True)
-                exchange = cells[6].get_text(strip=True)
-                lead_manager = cells[7].get_text(strip=True) if len(cells) > 7 else ''
+                company_name, open_date_text, close_date_text, list_date_text, price, total_issue, exchange, lead_manager = cells[:8]
                 
-                # Parse dates and check if they belong to the specified month
+                # Parse dates
                 open_date = _parse_date(open_date_text, year)
                 close_date = _parse_date(close_date_text, year)
-                list_date = _parse_date(list_date_text, year) if list_date_text and list_date_text != 'Yet to list' else 'Yet to list'
+                listed = bool(list_date_text) and list_date_text != NOT_LISTED
+                list_date = _parse_date(list_date_text, year) if listed else None
                 
-                # Filter by month - check if close_date falls in the specified month
-                if open_date and close_date:
-                    if close_date.month == month:
-                        ipos.append({
-                            'company_name': company_name,
-                            'open_date': open_date.strftime('%Y-%m-%d'),
-                            'close_date': close_date.strftime('%Y-%m-%d'),
-                            'list_date': list_date.strftime('%Y-%m-%d') if list_date != 'Yet to list' else 'Yet to list',
-                            'price': price,
-                            'total_issue_amount': total_issue,
-                            'exchange': exchange,
-                            'lead_manager': lead_manager
-                        })
+                if open_date and close_date and (list_date or not listed):
+                    ipos.append(IPORecord.from_values(
+                        company_name,
+                        open_date.date(),
+                        close_date.date(),
+                        list_date.date() if list_date else None,
+                        price,
+                        total_issue,
+                        exchange,
+                        lead_manager
+                    ))
             except (ValueError, AttributeError, IndexError):
                 # Skip rows with parsing errors
                 continue
     
-    return {
-        'year': year,
-        'month': month,
-        'month_name': month_names[month],
-        'total_ipos': len(ipos),
-        'ipos': ipos
-    }
+    return ipos
+
+
+def _parse_ipo_page(html, year: int, backend: str = DEFAULT_BACKEND) -> Tuple[List[IPORecord], Optional[str]]:
+    # Only the IPO table is parsed, with the fastest installed backend (see table_parser)
+    rows = extract_table_rows(html, backend)
+    
+    if rows is None:
+        return [], 'No IPO data table found on the webpage'
+    
+    return _parse_ipo_rows(rows, year), None
+
+
+def _fetch_with_selenium(url: str, year: int, pool: DriverPool = None) -> Tuple[List[IPORecord], Optional[str]]:
+    """Fetch data using Selenium to render JavaScript content, on a pooled warm driver."""
+    
+    pool = pool or get_driver_pool()
+    
+    with pool.driver() as driver:
+        driver.get(url)
+        
+        # Wait for table to load
+        wait = WebDriverWait(driver, 10)
+        wait.until(EC.presence_of_element_located((By.TAG_NAME, 'table')))
+        
+        page_source = driver.page_source
+    
+    return _parse_ipo_page(page_source, year)
+
+
+def _fetch_with_requests(url: str, year: int, headers: Dict,
+                         session: CachedSession = None,
+                         force_refresh: bool = False) -> Tuple[List[IPORecord], Optional[str]]:
+    """
+    Fetch data using requests, through a pooled keep-alive session with an
+    on-disk HTTP cache (fresh for IPO_HTTP_CACHE_TTL seconds, then revalidated
+    with ETag / Last-Modified). force_refresh revalidates even a fresh copy.
+    """
+    
+    session = session or get_http_session()
+    response = session.get(url, headers=headers, timeout=10, force_refresh=force_refresh)
+    
+    return _parse_ipo_page(response.content, year)
 
 
 def _parse_date(date_str: str, year: int) -> datetime:
     """
     Parse date string in format 'Mon, Dec 22, 2025' to datetime object.
     
+    Delegates to the memoized default_date_parser; failures are counted
+    there (see get_date_parse_stats).
+    
     Args:
         date_str (str): Date string to parse
         year (int): Default year if not present in string
@@ -244,21 +304,7 @@ def _parse_date(date_str: str, year: int) -> datetime:
     Returns:
         datetime object or None if parsing fails
     """
-    date_str = date_str.strip()
-    
-    if not date_str:
-        return None
-    
-    try:
-        # Try parsing with year
-        return datetime.strptime(date_str, '%a, %b %d, %Y')
-    except ValueError:
-        try:
-            # Try parsing without year
-            parsed = datetime.strptime(date_str, '%a, %b %d')
-            return parsed.replace(year=year)
-        except ValueError:
-            return None
+    return default_date_parser.parse(date_str, year)
 
 
 def get_ipo_data_json(month: int, year: int) -> str:
@@ -276,6 +322,14 @@ def get_ipo_data_json(month: int, year: int) -> str:
     return json.dumps(data, indent=2)
 
 
+def get_ipo_range_json(start_month: int, start_year: int, end_month: int, end_year: int) -> str:
+    """
+    Get IPO data for a range of months as a JSON string (list of month results).
+    """
+    data = fetch_ipo_range(start_month, start_year, end_month, end_year)
+    return json.dumps(data, indent=2)
+
+
 # if __name__ == "__main__":
 #     # Example usage
 #     print("Fetching December 2025 IPO data...")
@@ -0,0 +1,190 @@
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import sqlite_utils
+
+from .ipo_fetcher import MONTH_NAMES, fetch_ipo_year
+from .models import IPORecord
+
+
+DEFAULT_DB_PATH = Path(os.getenv("IPO_STORE_PATH", Path(__file__).resolve().parent / "ipo_listings.db"))
+
+IPO_FIELDS = [
+    'company_name', 'open_date', 'close_date', 'list_date', 'price',
+    'total_issue_amount', 'exchange', 'lead_manager'
+]
+
+
+class IPOStore:
+    """
+    Persistent local store of scraped IPO listings (SQLite via sqlite-utils).
+
+    Rows are upserted on (company_name, open_date), so syncing the same year
+    again updates listings in place. close_date, exchange and lead_manager
+    are indexed for the query API. Parsed price bounds and issue size are
+    stored as REAL columns so price / size filters run in SQL.
+
+    Usage:
+        store = IPOStore()
+        store.sync_year(2025)                      # scrape once
+        store.query(month=12, year=2025)           # then query offline
+        store.query(exchange='BSE, NSE', start_date='2025-01-01')
+        store.query(year=2025, max_price=500, as_records=True)
+    """
+
+    def __init__(self, path: Path = DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite_utils.Database(self.path)
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        table = self.db['ipos']
+        table.create({
+            'company_name': str,
+            'open_date': str,
+            'close_date': str,
+            'list_date': str,
+            'price': str,
+            'total_issue_amount': str,
+            'exchange': str,
+            'lead_manager': str,
+            'price_low': float,
+            'price_high': float,
+            'issue_size_cr': float,
+            'fetched_at': str
+        }, pk=('company_name', 'open_date'), if_not_exists=True)
+
+        # stores created before the numeric columns existed
+        for column in ('price_low', 'price_high', 'issue_size_cr'):
+            if column not in table.columns_dict:
+                table.add_column(column, float)
+
+        for column in ('close_date', 'exchange', 'lead_manager'):
+            table.create_index([column], if_not_exists=True)
+
+    def upsert_ipos(self, ipos: Iterable[Union[IPORecord, Dict[str, Any]]]) -> int:
+        """Insert or update IPORecords or IPO dicts (fetch_ipo_data format). Returns the number of rows written."""
+        fetched_at = datetime.now().isoformat(timespec='seconds')
+        records = []
+        for ipo in ipos:
+            record = ipo if isinstance(ipo, IPORecord) else IPORecord.from_dict(ipo)
+            records.append(dict(
+                record.to_dict(),
+                price_low=record.price_low,
+                price_high=record.price_high,
+                issue_size_cr=record.issue_size_cr,
+                fetched_at=fetched_at
+            ))
+        if records:
+            self.db['ipos'].upsert_all(records, pk=('company_name', 'open_date'), alter=True)
+        return len(records)
+
+    def sync_year(self, year: int, use_selenium: bool = True, refresh: bool = False) -> int:
+        """
+        Scrape a year with fetch_ipo_year and upsert it.
+
+        Raises:
+            RuntimeError: If the fetch failed (nothing is written)
+        """
+        data = fetch_ipo_year(year, use_selenium, refresh, store=self)
+        if 'error' in data:
+            raise RuntimeError(data['error'])
+        return data['total_ipos']
+
+    def query(
+        self,
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        exchange: Optional[str] = None,
+        lead_manager: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_issue_size: Optional[float] = None,
+        limit: Optional[int] = None,
+        as_records: bool = False
+    ) -> List[Union[Dict[str, Any], IPORecord]]:
+        """
+        Query stored IPOs, ordered by close date.
+
+        Args:
+            month (int), year (int): IPOs closing in that month (month needs year) or year
+            start_date (str), end_date (str): Inclusive close_date range (YYYY-MM-DD)
+            exchange (str): Exact exchange value, e.g. 'BSE, NSE'
+            lead_manager (str): Exact lead manager name
+            min_price (float), max_price (float): Keep IPOs whose price band lies within these bounds
+            min_issue_size (float): Minimum issue size in crores
+            limit (int): Maximum number of rows
+            as_records (bool): Return IPORecord objects instead of dicts
+
+        Returns:
+            List of IPO dicts in the fetch_ipo_data format (or IPORecords)
+        """
+        where = []
+        params = []
+
+        if month is not None:
+            if year is None:
+                raise ValueError("month filter needs a year")
+            if not (1 <= month <= 12):
+                raise ValueError(f"Invalid month: {month}. Month must be between 1 and 12.")
+            # a range on close_date keeps the index usable
+            next_month = f"{year + 1}-01-01" if month == 12 else f"{year}-{month + 1:02d}-01"
+            where.append("close_date >= ? AND close_date < ?")
+            params += [f"{year}-{month:02d}-01", next_month]
+        elif year is not None:
+            where.append("close_date >= ? AND close_date < ?")
+            params += [f"{year}-01-01", f"{year + 1}-01-01"]
+
+        if start_date is not None:
+            where.append("close_date >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            where.append("close_date <= ?")
+            params.append(end_date)
+        if exchange is not None:
+            where.append("exchange = ?")
+            params.append(exchange)
+        if lead_manager is not None:
+            where.append("lead_manager = ?")
+            params.append(lead_manager)
+        if min_price is not None:
+            where.append("price_low >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            where.append("price_high <= ?")
+            params.append(max_price)
+        if min_issue_size is not None:
+            where.append("issue_size_cr >= ?")
+            params.append(min_issue_size)
+
+        sql = f"SELECT {', '.join(IPO_FIELDS)} FROM ipos"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY close_date, company_name"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self.db.query(sql, params)
+        if as_records:
+            return [IPORecord.from_dict(row) for row in rows]
+        return list(rows)
+
+    def month_data(self, month: int, year: int) -> Dict[str, Any]:
+        """Offline equivalent of fetch_ipo_data(month, year)."""
+        ipos = self.query(month=month, year=year)
+        return {
+            'year': year,
+            'month': month,
+            'month_name': MONTH_NAMES[month],
+            'total_ipos': len(ipos),
+            'ipos': ipos
+        }
+
+    def count(self) -> int:
+        return self.db['ipos'].count
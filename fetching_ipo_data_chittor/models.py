@@ -0,0 +1,118 @@
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+
+NOT_LISTED = 'Yet to list'
+
+_NUMBER = re.compile(r'\d[\d,]*(?:\.\d+)?')
+_PRICE_BAND = re.compile(r'\bto\b', re.IGNORECASE)
+
+
+def parse_price_bounds(text: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Lower and upper price from 'Rs 100 to 110', '100.00 to 110.00' or '95.00'.
+
+    A fixed price gives equal bounds; text without a number gives (None, None).
+    The sides of a 'to' band are parsed separately, so a side that is still a
+    placeholder ('[.] to 200', '₹[●] to ₹200') stays None.
+    """
+    sides = _PRICE_BAND.split(text or '', maxsplit=1)
+    if len(sides) == 2:
+        low, high = (_first_number(side) for side in sides)
+        return low, high
+    numbers = [float(number.replace(',', '')) for number in _NUMBER.findall(text or '')]
+    if not numbers:
+        return None, None
+    return min(numbers), max(numbers)
+
+
+def _first_number(text: str) -> Optional[float]:
+    match = _NUMBER.search(text)
+    return float(match.group().replace(',', '')) if match else None
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """Issue size in crores from '1,234.56' (None if there is no number)."""
+    return _first_number(text or '')
+
+
+@dataclass(frozen=True, slots=True)
+class IPORecord:
+    """
+    One scraped IPO listing with typed fields.
+
+    Dates are `date` objects (list_date is None while the IPO is not listed),
+    and price bounds / issue size are parsed once so filters compare numbers.
+    The raw price and issue size texts are kept, so to_dict() reproduces the
+    fetch_ipo_data JSON shape exactly.
+    """
+
+    company_name: str
+    open_date: date
+    close_date: date
+    list_date: Optional[date]
+    price_low: Optional[float]
+    price_high: Optional[float]
+    issue_size_cr: Optional[float]
+    exchange: str
+    lead_manager: str
+    price_text: str
+    issue_size_text: str
+
+    @classmethod
+    def from_values(
+        cls,
+        company_name: str,
+        open_date: date,
+        close_date: date,
+        list_date: Optional[date],
+        price: str,
+        total_issue_amount: str,
+        exchange: str,
+        lead_manager: str
+    ) -> 'IPORecord':
+        price_low, price_high = parse_price_bounds(price)
+        return cls(
+            company_name, open_date, close_date, list_date,
+            price_low, price_high, parse_amount(total_issue_amount),
+            exchange, lead_manager, price, total_issue_amount
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IPORecord':
+        """Inverse of to_dict (accepts the fetch_ipo_data IPO dicts)."""
+        list_date = data['list_date']
+        return cls.from_values(
+            data['company_name'],
+            date.fromisoformat(data['open_date']),
+            date.fromisoformat(data['close_date']),
+            None if list_date in (None, NOT_LISTED) else date.fromisoformat(list_date),
+            data['price'],
+            data['total_issue_amount'],
+            data['exchange'],
+            data['lead_manager']
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The IPO dict in the fetch_ipo_data JSON shape."""
+        return {
+            'company_name': self.company_name,
+            'open_date': self.open_date.isoformat(),
+            'close_date': self.close_date.isoformat(),
+            'list_date': self.list_date.isoformat() if self.list_date else NOT_LISTED,
+            'price': self.price_text,
+            'total_issue_amount': self.issue_size_text,
+            'exchange': self.exchange,
+            'lead_manager': self.lead_manager
+        }
+
+    @property
+    def is_listed(self) -> bool:
+        return self.list_date is not None
+
+    @property
+    def is_book_built(self) -> bool:
+        # a band with a placeholder side is still a band
+        return self.price_high is not None and self.price_low != self.price_high
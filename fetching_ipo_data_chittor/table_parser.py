@@ -0,0 +1,115 @@
+import os
+import re
+from typing import Callable, Dict, List, Optional, Union
+
+
+# 'auto' picks the fastest installed backend: selectolax, then lxml, then BeautifulSoup
+DEFAULT_BACKEND = os.getenv("IPO_TABLE_PARSER", "auto")
+
+_TABLE_TAG = re.compile(r'<(/?)table\b', re.IGNORECASE)
+
+Rows = List[List[str]]
+
+
+def slice_first_table(html: str) -> Optional[str]:
+    """
+    Return the markup of the first <table> ... </table> (nested tables included),
+    or None if the page has no table. Lets every backend parse only the table.
+    """
+    depth = 0
+    start = None
+    for match in _TABLE_TAG.finditer(html):
+        if not match.group(1):
+            if depth == 0:
+                start = match.start()
+            depth += 1
+        elif depth:
+            depth -= 1
+            if depth == 0:
+                end = html.find('>', match.end())
+                return html[start:end + 1 if end != -1 else len(html)]
+    # unterminated table, let the parser close it
+    return html[start:] if start is not None else None
+
+
+def _rows_bs4(table_html: str) -> Rows:
+    from bs4 import BeautifulSoup
+
+    table = BeautifulSoup(table_html, 'html.parser').find('table')
+    rows = table.find_all('tr')[1:]  # Skip header row
+    return [[cell.get_text(strip=True) for cell in row.find_all('td')] for row in rows]
+
+
+def _rows_lxml(table_html: str) -> Rows:
+    import lxml.html
+
+    table = lxml.html.fragment_fromstring(table_html)
+    rows = list(table.iter('tr'))[1:]  # Skip header row
+    return [
+        [''.join(text.strip() for text in cell.itertext()) for cell in row.iter('td')]
+        for row in rows
+    ]
+
+
+def _rows_selectolax(table_html: str) -> Rows:
+    from selectolax.lexbor import LexborHTMLParser
+
+    table = LexborHTMLParser(table_html).css_first('table')
+    rows = table.css('tr')[1:]  # Skip header row
+    return [
+        [cell.text(deep=True, separator='', strip=True) for cell in row.css('td')]
+        for row in rows
+    ]
+
+
+BACKENDS: Dict[str, Callable[[str], Rows]] = {
+    'selectolax': _rows_selectolax,
+    'lxml': _rows_lxml,
+    'bs4': _rows_bs4,
+}
+
+
+def available_backends() -> List[str]:
+    names = []
+    for name, module in (('selectolax', 'selectolax.lexbor'), ('lxml', 'lxml.html'), ('bs4', 'bs4')):
+        try:
+            __import__(module)
+            names.append(name)
+        except ImportError:
+            continue
+    return names
+
+
+def resolve_backend(backend: str = DEFAULT_BACKEND) -> str:
+    if backend == 'auto':
+        installed = available_backends()
+        if not installed:
+            raise ImportError("No HTML parser installed (selectolax, lxml or beautifulsoup4)")
+        return installed[0]
+    if backend not in BACKENDS:
+        raise ValueError(f"Invalid parser backend: {backend}. Use one of {sorted(BACKENDS)} or 'auto'.")
+    return backend
+
+
+def extract_table_rows(html: Union[str, bytes], backend: str = DEFAULT_BACKEND) -> Optional[Rows]:
+    """
+    Cell texts of every row (header row skipped) of the first table on the page.
+
+    Only the table markup is parsed, with the chosen backend. Cell text matches
+    BeautifulSoup's get_text(strip=True) for every backend.
+
+    Args:
+        html (str or bytes): Page source
+        backend (str): 'selectolax', 'lxml', 'bs4' or 'auto'
+
+    Returns:
+        List of rows (list of cell strings), or None when the page has no table
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+
+    table_html = slice_first_table(html)
+    if table_html is None:
+        return None
+
+    return BACKENDS[resolve_backend(backend)](table_html)
@@ -1,12 +1,81 @@
-from ipo_evaluator import run_ui_eval
+import os
+import time
+from ipo_evaluator import astream_ui_eval
 import gradio as gr
 
-demo = gr.Interface(
-    fn=run_ui_eval,
-    inputs=gr.Textbox(label="Enter IPO Name"),
-    outputs=gr.JSON(),
-    title="IPO DRHP RAG Evaluator"
-)
+# evaluations running at once; more requests wait in Gradio's queue
+UI_CONCURRENCY_LIMIT = int(os.getenv("IPO_APP_CONCURRENCY", "4"))
+
+# seconds between re-renders while answers are streaming
+RENDER_INTERVAL = 0.2
+
+
+def render_progress(company, topics, average=None):
+    lines = [f"## {company}"]
+    if average is not None:
+        lines.append(f"**Average Score:** {average:.2f}")
+    for topic, state in topics.items():
+        if state["error"]:
+            status = f"failed: {state['error']}"
+        elif state["score"] is not None:
+            status = f"score {state['score']}"
+        elif state["answer"]:
+            status = "scoring..." if state["answered"] else "answering..."
+        else:
+            status = "waiting..."
+        lines.append(f"### {topic} ({status})")
+        if state["answer"]:
+            lines.append(state["answer"])
+    return "\n\n".join(lines)
+
+
+async def stream_eval(ipo_name):
+    company = None
+    topics = {}
+    last_render = 0.0
+
+    async for event in astream_ui_eval(ipo_name):
+        kind = event["event"]
+
+        if kind == "start":
+            company = event["company"]
+            topics = {topic: {"answer": "", "answered": False, "score": None, "error": None}
+                      for topic in event["topics"]}
+        elif kind == "error" and "topic" not in event:
+            yield f"**Error:** {event['error']}", None
+            return
+        elif kind == "token":
+            topics[event["topic"]]["answer"] += event["text"]
+            if time.monotonic() - last_render < RENDER_INTERVAL:
+                continue
+        elif kind == "answer":
+            topics[event["topic"]].update(answer=event["answer"], answered=True)
+        elif kind == "score":
+            score = event["result"]["score"]
+            topics[event["topic"]]["score"] = score if score is not None else event["result"]["score_raw"]
+        elif kind == "error":
+            topics[event["topic"]]["error"] = event["error"]
+        elif kind == "done":
+            details = {"Company": company, "Average Score": event["average"], "Details": event["report"]}
+            yield render_progress(company, topics, event["average"]), details
+            return
+
+        last_render = time.monotonic()
+        yield render_progress(company, topics), None
+
+
+with gr.Blocks(title="IPO DRHP RAG Evaluator") as demo:
+    gr.Markdown("# IPO DRHP RAG Evaluator")
+    ipo_name = gr.Textbox(label="Enter IPO Name")
+    evaluate = gr.Button("Evaluate", variant="primary")
+    progress = gr.Markdown()
+    details = gr.JSON(label="Details")
+
+    # button and Enter share one concurrency limit
+    for trigger in (evaluate.click, ipo_name.submit):
+        trigger(stream_eval, inputs=ipo_name, outputs=[progress, details], concurrency_id="evaluate")
+
+demo.queue(default_concurrency_limit=UI_CONCURRENCY_LIMIT)
 
 if __name__ == "__main__":
-    demo.launch(inbrowser=True)
\ No newline at end of file
+    demo.launch(inbrowser=True)
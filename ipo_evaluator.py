@@ -1,23 +1,124 @@
-from Utilities.utils import dhrp_doc_collection,call_llm,MODEL
+from Utilities.utils import call_llm,MODEL,AsyncLLMClient
 from Utilities.parameter_utils import eval_parameters,eval_questions
-from tools.query_vector_database_tool import rag_pipeline
-from openai import OpenAI
+from Utilities.company_utils import resolve_company
+from tools.query_vector_database_tool import (rag_pipeline, aanswer_question, get_relevant_docs_batch,
+                                              astream_answer, amerge_streams)
 import os
+import re
+import json
+import asyncio
 from dotenv import load_dotenv
 
 
+IPO_EXPERT_PROMPT = '''You are an expert IPO analyst.
+                        Evaluate the company answer against the ideal answer and provide a score from 1 to 10, where 10 indicates a perfect match.
+                        Consider accuracy, completeness, relevance, clarity, and depth of analysis in your evaluation.
+                        Provide only score and nothing else.
+                        '''
+
+BATCH_EXPERT_PROMPT = '''You are an expert IPO analyst.
+                        For every topic, evaluate the actual answer against the ideal answer and give a score from 1 to 10, where 10 indicates a perfect match.
+                        Consider accuracy, completeness, relevance, clarity, and depth of analysis in your evaluation.
+                        Respond with JSON only, in the form {"scores": {"<topic>": <score>, ...}}, using every topic exactly as given.
+                        '''
+
+# accepts "8", "8.5", "8/10", "Score: 8" - anything else is rejected
+_SCORE_PATTERN = re.compile(r'^\s*(?:score\s*[:=-]?\s*)?(\d{1,2}(?:\.\d+)?)\s*(?:/\s*10)?\s*\.?\s*$', re.IGNORECASE)
+
+
+def parse_score(raw):
+    """
+    Strictly parse a judge score into a number between 1 and 10.
+    Returns None when the value is not a valid score.
+    """
+    if isinstance(raw, bool):
+        return None
+    if isinstance(raw, (int, float)):
+        value = raw
+    else:
+        match = _SCORE_PATTERN.match(str(raw))
+        if not match:
+            return None
+        value = float(match.group(1))
+
+    if not 1 <= value <= 10:
+        return None
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def build_evaluation_prompt(key, company_answer, ideal_answer):
+    return f"""
+            Topic: {key}
+            Actual Answer: {company_answer}
+            Ideal Answer: {ideal_answer}
+            Score the Actual Answer against the Ideal Answer (1-10).
+            Only provide the score as a number from 1 to 10.
+            """
+
+
+def build_batch_evaluation_prompt(company_answers, ideal_answers):
+    topics = [
+        {"topic": key, "actual_answer": company_answers[key], "ideal_answer": ideal_answer}
+        for key, ideal_answer in ideal_answers.items()
+    ]
+    return json.dumps({"topics": topics}, ensure_ascii=False)
+
+
+def parse_batch_scores(raw):
+    """Parse the batched judge response into {topic: raw score}."""
+    text = raw.strip()
+    # models like to wrap JSON in ```json fences
+    if text.startswith("```"):
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        print(f"Invalid batch score response: {raw}")
+        return {}
+    scores = data.get("scores", {}) if isinstance(data, dict) else {}
+    return scores if isinstance(scores, dict) else {}
+
+
+def _report_entry(key, company_answer, ideal_answer, score_raw):
+    return {
+        "topic": key,
+        "rag_answer": company_answer,
+        "ideal_answer": ideal_answer,
+        "score": parse_score(score_raw),
+        "score_raw": str(score_raw).strip(),
+    }
+
+
 #dict implementation
 
-def ipo_evaluator(company_questions, ideal_answers,vector_collection = dhrp_doc_collection):
+def ipo_evaluator(company_questions, ideal_answers,vector_collection = None,
+                  concurrent=False, batch_scoring=False, max_concurrency=None, company=None):
     """
-    Evaluates RAG performance. 
+    Evaluates RAG performance.
     company_questions: List of dicts e.g., [{"risk": "What are the risks?"}]
     ideal_answers: List of strings/dicts corresponding to the questions
+    vector_collection: Chroma collection to search, defaults to the shared DHRP collection
+    concurrent: answer and score topics in parallel, scoring each topic as soon as its answer arrives
+    batch_scoring: score all topics with a single structured-JSON judge call
+    company: company key (see Utilities.company_utils) to restrict retrieval to that company's DRHP
     """
+    if concurrent:
+        return asyncio.run(aipo_evaluator(company_questions, ideal_answers, vector_collection,
+                                          batch_scoring=batch_scoring, max_concurrency=max_concurrency,
+                                          company=company))
+
     final_report = []
 
-    company_answers = rag_pipeline(company_questions,vector_collection)
-    
+    company_answers = rag_pipeline(company_questions,vector_collection, company=company)
+
+    if batch_scoring:
+        batch_prompt = build_batch_evaluation_prompt(company_answers, ideal_answers)
+        scores = parse_batch_scores(call_llm(MODEL, BATCH_EXPERT_PROMPT, batch_prompt))
+        return [
+            _report_entry(key, company_answers[key], ideal_answer, scores.get(key, ""))
+            for key, ideal_answer in ideal_answers.items()
+        ]
+
     for key,value in ideal_answers.items():
         ideal_answer = ideal_answers[key]
         # print(ideal_answer)
@@ -25,54 +126,134 @@ def ipo_evaluator(company_questions, ideal_answers,vector_collection = dhrp_doc_
         # print(company_answer)
 
         #  Preparing Evaluation Prompt
-        ipo_expert_prompt = '''You are an expert IPO analyst.
-                        Evaluate the company answer against the ideal answer and provide a score from 1 to 10, where 10 indicates a perfect match.  
-                        Consider accuracy, completeness, relevance, clarity, and depth of analysis in your evaluation.
-                        Provide only score and nothing else. 
-                        '''
-            
-        evaluation_prompt = f"""
-            Topic: {key}
-            Actual Answer: {company_answer}
-            Ideal Answer: {ideal_answer}
-            Score the Actual Answer against the Ideal Answer (1-10).
-            Only provide the score as a number from 1 to 10.
-            """
-        
-        score_raw = call_llm(MODEL, ipo_expert_prompt, evaluation_prompt)
+        evaluation_prompt = build_evaluation_prompt(key, company_answer, ideal_answer)
+
+        score_raw = call_llm(MODEL, IPO_EXPERT_PROMPT, evaluation_prompt)
 
         # 3. Store Results
-        final_report.append({
-                "topic": key,
-                "rag_answer": company_answer,
-                "ideal_answer": ideal_answer,
-                "score": score_raw.strip()
-            })
-            
+        final_report.append(_report_entry(key, company_answer, ideal_answer, score_raw))
+
     return final_report
 
 
+async def aipo_evaluator(company_questions, ideal_answers, vector_collection=None,
+                         batch_scoring=False, max_concurrency=None, company=None):
+    """Async ipo_evaluator: retrieval is batched, then each topic is scored as soon as its answer arrives."""
+    questions = {key: question for item in company_questions for key, question in item.items()}
+
+    keys = list(ideal_answers)
+    all_documents = await asyncio.to_thread(
+        get_relevant_docs_batch, [questions[key] for key in keys], vector_collection, company=company
+    )
+    documents_by_key = dict(zip(keys, all_documents))
+
+    async with AsyncLLMClient(max_concurrency=max_concurrency) as llm_client:
+
+        async def answer_and_score(key, ideal_answer):
+            company_answer = await aanswer_question(questions[key], vector_collection, llm_client,
+                                                    documents_by_key[key])
+            if batch_scoring:
+                return company_answer, None
+            evaluation_prompt = build_evaluation_prompt(key, company_answer, ideal_answer)
+            score_raw = await llm_client.call_llm(MODEL, IPO_EXPERT_PROMPT, evaluation_prompt)
+            return company_answer, score_raw
+
+        results = await asyncio.gather(
+            *(answer_and_score(key, ideal_answer) for key, ideal_answer in ideal_answers.items())
+        )
+
+        if batch_scoring:
+            company_answers = {key: answer for key, (answer, _) in zip(ideal_answers, results)}
+            batch_prompt = build_batch_evaluation_prompt(company_answers, ideal_answers)
+            scores = parse_batch_scores(await llm_client.call_llm(MODEL, BATCH_EXPERT_PROMPT, batch_prompt))
+            results = [(answer, scores.get(key, "")) for key, (answer, _) in zip(ideal_answers, results)]
+
+    return [
+        _report_entry(key, company_answer, ideal_answer, score_raw)
+        for (key, ideal_answer), (company_answer, score_raw) in zip(ideal_answers.items(), results)
+    ]
+
+
+async def astream_ipo_evaluator(company_questions, ideal_answers, vector_collection=None,
+                                max_concurrency=None, company=None):
+    """
+    Streaming aipo_evaluator. Yields events as each topic progresses:
+        {"event": "token", "topic", "text"}       answer text as the LLM writes it
+        {"event": "answer", "topic", "answer"}    full answer
+        {"event": "score", "topic", "result"}     report entry (same as ipo_evaluator)
+        {"event": "error", "topic", "error"}      this topic failed, the others go on
+        {"event": "done", "report", "average"}    report in topic order and its average score
+    """
+    questions = {key: question for item in company_questions for key, question in item.items()}
+
+    keys = list(ideal_answers)
+    all_documents = await asyncio.to_thread(
+        get_relevant_docs_batch, [questions[key] for key in keys], vector_collection, company=company
+    )
+
+    results = {}
+
+    async with AsyncLLMClient(max_concurrency=max_concurrency) as llm_client:
+
+        async def answer_and_score(key, documents):
+            try:
+                company_answer = None
+                async for event in astream_answer(key, questions[key], documents, llm_client):
+                    if event["event"] == "answer":
+                        company_answer = event["answer"]
+                    yield event
+
+                evaluation_prompt = build_evaluation_prompt(key, company_answer, ideal_answers[key])
+                score_raw = await llm_client.call_llm(MODEL, IPO_EXPERT_PROMPT, evaluation_prompt)
+                results[key] = _report_entry(key, company_answer, ideal_answers[key], score_raw)
+                yield {"event": "score", "topic": key, "result": results[key]}
+            except Exception as e:
+                yield {"event": "error", "topic": key, "error": str(e)}
+
+        async for event in amerge_streams(answer_and_score(key, documents)
+                                          for key, documents in zip(keys, all_documents)):
+            yield event
+
+    report = [results[key] for key in keys if key in results]
+    yield {"event": "done", "report": report, "average": avg_score(report)}
+
+
 def avg_score(evaluation_result):
     total_score = 0
     count = 0
 
     for item in evaluation_result:
         if "score" in item:
-            try:
-                score = int(item["score"])
-                total_score += score
-                count += 1
-            except ValueError:
-                print(f"Invalid score format: {item['score']}")
+            score = parse_score(item["score"])
+            if score is None:
+                print(f"Invalid score format: {item.get('score_raw', item['score'])}")
+                continue
+            total_score += score
+            count += 1
 
     average = total_score / count if count > 0 else 0
-    return average 
+    return average
 
 
 # --- Gradio UI Wrapper ---
 def run_ui_eval(ipo_name):
-    # This is a placeholder for how you'd trigger it in the UI
-    # In a real scenario, you'd fetch 'eval_questions' based on the ipo_name
-    results = ipo_evaluator(eval_questions, eval_parameters,dhrp_doc_collection)
+    # retrieval only searches the DRHP of the company typed in the UI
+    try:
+        company = resolve_company(ipo_name)
+    except ValueError as e:
+        return {"Error": str(e)}
+    results = ipo_evaluator(eval_questions, eval_parameters, concurrent=True, company=company)
     avg = avg_score(results)
-    return {"Average Score": avg, "Details": results}
+    return {"Company": company or ipo_name, "Average Score": avg, "Details": results}
+
+
+async def astream_ui_eval(ipo_name):
+    """Streaming run_ui_eval: a "start" event with the company and topics, then astream_ipo_evaluator events."""
+    try:
+        company = resolve_company(ipo_name)
+    except ValueError as e:
+        yield {"event": "error", "error": str(e)}
+        return
+    yield {"event": "start", "company": company or ipo_name, "topics": list(eval_parameters)}
+    async for event in astream_ipo_evaluator(eval_questions, eval_parameters, company=company):
+        yield event
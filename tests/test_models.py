@@ -0,0 +1,24 @@
+import pytest
+
+from fetching_ipo_data_chittor.models import parse_price_bounds
+
+
+@pytest.mark.parametrize("text, bounds", [
+    ("Rs 100 to 110", (100.0, 110.0)),
+    ("1,000.00 to 1,050.00", (1000.0, 1050.0)),
+    ("95.00", (95.0, 95.0)),
+    ("", (None, None)),
+    ("[.]", (None, None)),
+])
+def test_parse_price_bounds(text, bounds):
+    assert parse_price_bounds(text) == bounds
+
+
+@pytest.mark.parametrize("text, bounds", [
+    ("[.] to 200", (None, 200.0)),
+    ("₹[●] to ₹200", (None, 200.0)),
+    ("₹190 to ₹[●]", (190.0, None)),
+    ("[●] to [●]", (None, None)),
+])
+def test_placeholder_band_side_stays_unknown(text, bounds):
+    assert parse_price_bounds(text) == bounds
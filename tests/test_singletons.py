@@ -0,0 +1,47 @@
+import sys
+import types
+import threading
+
+import pytest
+
+from Utilities import utils
+
+
+class FakeClient:
+    def __init__(self, path):
+        self.path = path
+
+    def get_collection(self, name):
+        return ("collection", name)
+
+
+@pytest.fixture
+def fresh_singletons(monkeypatch):
+    monkeypatch.setitem(sys.modules, "chromadb", types.SimpleNamespace(PersistentClient=FakeClient))
+    monkeypatch.setattr(utils, "_singletons", {})
+
+
+def call_with_timeout(getter, timeout=5):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", getter()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"{getter.__name__}() deadlocked on a cold start"
+    return result["value"]
+
+
+def test_cold_dhrp_collection_builds_client_first(fresh_singletons):
+    assert call_with_timeout(utils.get_dhrp_collection) == ("collection", utils.COLLECTION_NAME)
+    assert isinstance(utils.get_chroma_client(), FakeClient)
+    assert utils.get_dhrp_collection() is utils.get_dhrp_collection()
+
+
+def test_cold_compressed_collection(fresh_singletons):
+    assert call_with_timeout(utils.get_compressed_collection) == ("collection", utils.compressed_collection_name())
+
+
+def test_llm_response_cache_is_built_on_first_use(fresh_singletons, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE", "memory")
+    assert "llm_response_cache" not in utils._singletons
+    cache = utils.llm_response_cache
+    assert cache is not None and utils.get_llm_response_cache() is cache
@@ -0,0 +1,84 @@
+"""
+Import-time budget check.
+
+Imports a module in a fresh interpreter with `-X importtime`, reports the
+slowest imports and fails if the total goes over the budget or if any of the
+heavy libraries (torch, sentence_transformers, chromadb, openai) got pulled
+in at import time. Those must only load once a query actually runs.
+
+Usage:
+    python tools/check_import_time.py                      # checks ipo_evaluator
+    python tools/check_import_time.py ipo_evaluator --budget-ms 800
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1000"))
+HEAVY_MODULES = ["torch", "sentence_transformers", "chromadb", "openai"]
+
+
+def measure_import(module):
+    """Returns (total_ms, [(cumulative_ms, name), ...], loaded heavy modules)."""
+    probe = (
+        f"import {module}, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # top-level imports have no indentation before the name
+        if not name.startswith("  "):
+            timings.append((int(cumulative) / 1000, name.strip()))
+
+    # interpreter start-up imports (site, encodings, ...) are not ours to count
+    total_ms = sum(ms for ms, name in timings if name == module)
+    heavy = [m for m in result.stdout.strip().split(",") if m]
+    return total_ms, sorted(timings, reverse=True), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that a module imports within a time budget.")
+    parser.add_argument("module", nargs="?", default="ipo_evaluator")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    total_ms, timings, heavy = measure_import(args.module)
+
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for ms, name in timings[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    ok = True
+    if heavy:
+        print(f"FAIL: heavy modules loaded at import time: {', '.join(heavy)}")
+        ok = False
+    if total_ms > args.budget_ms:
+        print("FAIL: import time over budget")
+        ok = False
+
+    if ok:
+        print("OK")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Vector compression benchmark: memory, query latency and recall.
+
+Loads stored chunk embeddings (or synthetic ones with --synthetic), holds
+some out as queries and compares search layouts against exact float32
+search on the full vectors:
+
+  float32        current layout (768-dim float32)
+  float16        full vectors at half precision
+  pca:<d>        PCA-reduced search vectors (IPO_CHECKER_VECTOR_COMPRESSION)
+  truncate:<d>   first d dimensions
+  pq:<m>         product quantization, m one-byte codes per vector (ADC search)
+
+Every compressed layout is reported as is and with exact re-ranking of its
+top --candidates hits using the full vectors. Search is brute force in NumPy
+so layouts are compared on equal terms; index size adds the HNSW link
+overhead Chroma keeps per vector.
+
+Usage:
+    python tools/compression_benchmark.py
+    python tools/compression_benchmark.py --limit 20000 --queries 200 --k 5 --candidates 50
+    python tools/compression_benchmark.py --synthetic 50000
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from Utilities.vector_compression import VectorCompressor, exact_distances
+
+
+# hnswlib default M=16: layer-0 neighbour list of 2*M int32 ids per vector
+HNSW_LINK_BYTES = 2 * 16 * 4
+
+
+def load_vectors(limit):
+    from Utilities.utils import get_dhrp_collection
+    stored = get_dhrp_collection().get(limit=limit, include=["embeddings"])
+    return np.asarray(stored["embeddings"], dtype=np.float32)
+
+
+def synthetic_vectors(n, dim=768, rank=64, seed=0):
+    # low-rank structure plus noise, roughly like sentence embeddings
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(rank, dim)).astype(np.float32)
+    return (rng.normal(size=(n, rank)).astype(np.float32) @ basis / np.sqrt(rank)
+            + 0.1 * rng.normal(size=(n, dim)).astype(np.float32))
+
+
+class ProductQuantizer:
+    """m sub-vectors, 256 k-means centroids each, searched with asymmetric distance tables."""
+
+    def __init__(self, m, iterations=15, seed=0):
+        self.m = m
+        self.iterations = iterations
+        self.rng = np.random.default_rng(seed)
+
+    def fit(self, vectors):
+        self.sub_dim = vectors.shape[1] // self.m
+        self.centroids = []
+        for part in np.split(vectors[:, :self.m * self.sub_dim], self.m, axis=1):
+            centroids = part[self.rng.choice(len(part), 256, replace=len(part) < 256)].copy()
+            for _ in range(self.iterations):
+                assignment = self._assign(part, centroids)
+                for c in range(256):
+                    members = part[assignment == c]
+                    if len(members):
+                        centroids[c] = members.mean(axis=0)
+            self.centroids.append(centroids)
+        return self
+
+    @staticmethod
+    def _assign(part, centroids):
+        distances = (np.sum(part ** 2, axis=1, keepdims=True) - 2 * part @ centroids.T
+                     + np.sum(centroids ** 2, axis=1))
+        return np.argmin(distances, axis=1)
+
+    def encode(self, vectors):
+        parts = np.split(vectors[:, :self.m * self.sub_dim], self.m, axis=1)
+        return np.stack([self._assign(part, centroids).astype(np.uint8)
+                         for part, centroids in zip(parts, self.centroids)], axis=1)
+
+    def distances(self, query, codes):
+        parts = np.split(query[:self.m * self.sub_dim], self.m)
+        tables = np.stack([np.sum((centroids - part) ** 2, axis=1)
+                           for part, centroids in zip(parts, self.centroids)])
+        return tables[np.arange(self.m), codes].sum(axis=1)
+
+
+def recall(found, truth):
+    return np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+
+
+def evaluate(name, search, bytes_per_vector, base, queries, truth, k, candidates, full_vectors):
+    """Times search(query, n) for every query, with and without exact re-ranking."""
+    rows = []
+    for rerank in (False, True) if full_vectors is not None else (False,):
+        found = []
+        started = time.perf_counter()
+        for query in queries:
+            hits = search(query, candidates if rerank else k)
+            if rerank:
+                exact = exact_distances(query, full_vectors[hits])
+                hits = hits[np.argsort(exact, kind="stable")[:k]]
+            found.append(hits)
+        query_ms = (time.perf_counter() - started) / len(queries) * 1000
+        label = f"{name} + rerank" if rerank else name
+        index_mb = len(base) * (bytes_per_vector + HNSW_LINK_BYTES) / 1e6
+        rows.append((label, bytes_per_vector, index_mb, query_ms, recall(found, truth)))
+    return rows
+
+
+def top_n(distances, n):
+    n = min(n, len(distances))
+    hits = np.argpartition(distances, n - 1)[:n]
+    return hits[np.argsort(distances[hits], kind="stable")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory / latency / recall of vector compression layouts.")
+    parser.add_argument("--limit", type=int, default=20000, help="stored vectors to load")
+    parser.add_argument("--synthetic", type=int, help="use N synthetic vectors instead of the collection")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=50, help="hits re-ranked with the full vectors")
+    parser.add_argument("--dims", type=int, nargs="+", default=[256, 128])
+    parser.add_argument("--pq", type=int, nargs="+", default=[96, 48], help="PQ sub-vector counts")
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.synthetic) if args.synthetic else load_vectors(args.limit)
+    if len(vectors) <= args.queries:
+        print("Not enough vectors, ingest more DRHPs or use --synthetic")
+        return 1
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(vectors))
+    queries, base = vectors[order[:args.queries]], vectors[order[args.queries:]]
+    dim = base.shape[1]
+    print(f"{len(base)} vectors x {dim} dims, {len(queries)} held-out queries, "
+          f"recall@{args.k} against exact float32 search\n")
+
+    truth = [top_n(exact_distances(query, base), args.k) for query in queries]
+    half = base.astype(np.float16).astype(np.float32)
+
+    rows = []
+    rows += evaluate("float32", lambda q, n: top_n(exact_distances(q, base), n),
+                     dim * 4, base, queries, truth, args.k, args.candidates, None)
+    rows += evaluate("float16", lambda q, n: top_n(exact_distances(q, half), n),
+                     dim * 2, base, queries, truth, args.k, args.candidates, None)
+
+    for spec in [f"pca:{d}" for d in args.dims] + [f"truncate:{d}" for d in args.dims]:
+        compressor = VectorCompressor(spec).fit(base)
+        reduced = compressor.transform(base)
+        rows += evaluate(spec, lambda q, n: top_n(exact_distances(compressor.transform(q[None])[0], reduced), n),
+                         compressor.dim * 4, base, queries, truth, args.k, args.candidates, half)
+
+    for m in args.pq:
+        if dim % m:
+            continue
+        quantizer = ProductQuantizer(m).fit(base[rng.choice(len(base), min(len(base), 10000), replace=False)])
+        codes = quantizer.encode(base)
+        rows += evaluate(f"pq:{m}", lambda q, n: top_n(quantizer.distances(q, codes), n),
+                         m, base, queries, truth, args.k, args.candidates, half)
+
+    print(f"{'layout':<22} {'bytes/vec':>9} {'index MB':>9} {'query ms':>9} {'recall@k':>9}")
+    for label, bytes_per_vector, index_mb, query_ms, value in rows:
+        print(f"{label:<22} {bytes_per_vector:>9} {index_mb:>9.1f} {query_ms:>9.2f} {value:>9.3f}")
+    print(f"\nre-ranking reads {args.candidates} float16 full vectors ({args.candidates * dim * 2 / 1024:.0f} KB) per query")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Token-budgeted context assembly for the RAG prompts.
+
+Retrieved chunks overlap (chunks are built with a 200-char overlap) and
+neighbouring results often repeat the same text. assemble_context merges
+adjacent / overlapping chunks of the same file and page span, drops
+near-duplicate passages, and writes what fits in a token budget in a compact
+plain-text format instead of indented JSON.
+"""
+
+import os
+import re
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+# prompt tokens spent on retrieved context per question
+CONTEXT_TOKEN_BUDGET = int(os.getenv("IPO_CHECKER_CONTEXT_TOKENS", "1500"))
+
+# passages whose word 5-gram sets overlap at least this much are duplicates
+NEAR_DUPLICATE_JACCARD = 0.8
+SHINGLE_WORDS = 5
+
+# shorter overlaps than this are treated as coincidence, not chunk overlap
+MIN_MERGE_OVERLAP = 20
+
+# a budget remainder smaller than this is not worth a truncated passage
+MIN_PASSAGE_TOKENS = 50
+
+_WORD = re.compile(r'\w+')
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else the ~4 chars/token estimate."""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                try:
+                    import tiktoken
+                    _encoder = tiktoken.get_encoding("cl100k_base")
+                except ImportError:
+                    _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _overlap_length(left: str, right: str) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right`."""
+    probe = right[:MIN_MERGE_OVERLAP]
+    if len(probe) < MIN_MERGE_OVERLAP:
+        return 0
+    position = left.find(probe)
+    while position != -1:
+        if right.startswith(left[position:]):
+            return len(left) - position
+        position = left.find(probe, position + 1)
+    return 0
+
+
+def _shingles(text: str) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {tuple(words)}
+    return {tuple(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _span(metadata: Dict) -> Tuple[int, int]:
+    page = metadata.get("page", 0)
+    return metadata.get("start_page", page), metadata.get("end_page", page)
+
+
+def merge_passages(documents: List[str], metadatas: List[Dict]) -> List[Dict]:
+    """
+    Merge retrieved chunks that are neighbours in the same file (and, for
+    per-page chunks, the same page) into passages, ordered by the best rank
+    of their chunks. Chunks without a chunk_index merge only when their
+    texts overlap.
+
+    Returns:
+        [{'source', 'start_page', 'end_page', 'text', 'rank'}, ...]
+    """
+    groups = {}
+    for rank, (document, metadata) in enumerate(zip(documents, metadatas)):
+        # document-level chunks are numbered per file, per-page chunks per page
+        page_key = None if "start_page" in metadata else metadata.get("page")
+        key = (metadata.get("source", "unknown_source"), page_key)
+        groups.setdefault(key, []).append((metadata.get("chunk_index"), rank, document.strip(), metadata))
+
+    passages = []
+    for (source, _), chunks in groups.items():
+        # chunks stored without chunk_index (older collections) keep rank order
+        chunks.sort(key=lambda chunk: (chunk[0] is None, chunk[1] if chunk[0] is None else chunk[0]))
+        current = None
+        for chunk_index, rank, text, metadata in chunks:
+            start_page, end_page = _span(metadata)
+            overlap = _overlap_length(current["text"], text) if current else 0
+            # rank neighbours are not text neighbours: without chunk_index only real overlap merges
+            adjacent = (current and chunk_index is not None and current["last_index"] is not None
+                        and chunk_index == current["last_index"] + 1)
+            if current and (adjacent or overlap):
+                current["text"] += text[overlap:] if overlap else " " + text
+                current["end_page"] = max(current["end_page"], end_page)
+                current["rank"] = min(current["rank"], rank)
+                current["last_index"] = chunk_index
+                continue
+            if current:
+                passages.append(current)
+            current = {"source": source, "start_page": start_page, "end_page": end_page,
+                       "text": text, "rank": rank, "last_index": chunk_index}
+        passages.append(current)
+
+    for passage in passages:
+        del passage["last_index"]
+    passages.sort(key=lambda passage: passage["rank"])
+    return passages
+
+
+def drop_near_duplicates(passages: List[Dict], threshold: float = NEAR_DUPLICATE_JACCARD) -> List[Dict]:
+    """Keep the best-ranked copy of passages whose word shingles overlap >= threshold."""
+    kept = []
+    kept_shingles = []
+    for passage in passages:
+        shingles = _shingles(passage["text"])
+        duplicate = any(
+            len(shingles & other) / len(shingles | other) >= threshold
+            for other in kept_shingles
+        )
+        if not duplicate:
+            kept.append(passage)
+            kept_shingles.append(shingles)
+    return kept
+
+
+def _header(number: int, passage: Dict) -> str:
+    source = passage["source"].replace(".txt", "").replace(".pdf", "")
+    pages = (f"p.{passage['start_page']}" if passage["start_page"] == passage["end_page"]
+             else f"p.{passage['start_page']}-{passage['end_page']}")
+    return f"[{number}] {source} {pages}"
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    # cut by the char estimate, then back off to the last sentence end
+    cut = text[:max_tokens * 4]
+    while cut and count_tokens(cut) > max_tokens:
+        cut = cut[:int(len(cut) * 0.9)]
+    sentence_end = max(cut.rfind(". "), cut.rfind("? "), cut.rfind("! "))
+    return cut[:sentence_end + 1] if sentence_end > len(cut) // 2 else cut
+
+
+def assemble_context(documents: Dict, token_budget: Optional[int] = None) -> Tuple[str, Dict]:
+    """
+    Compact, deduplicated context for one question's retrieval results.
+
+    Args:
+        documents: single-query Chroma-shaped result (documents / metadatas lists)
+        token_budget (int): max context tokens, defaults to CONTEXT_TOKEN_BUDGET
+
+    Returns:
+        (context text, stats) where stats has chunks, passages, dropped_duplicates,
+        tokens, baseline_tokens (what build_context_json would have sent) and tokens_saved
+    """
+    token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    docs = documents.get("documents", [[]])[0]
+    metadatas = documents.get("metadatas", [[]])[0]
+
+    merged = merge_passages(docs, metadatas)
+    passages = drop_near_duplicates(merged)
+
+    blocks = []
+    used = 0
+    for passage in passages:
+        header = _header(len(blocks) + 1, passage)
+        block = f"{header}\n{passage['text']}"
+        tokens = count_tokens(block)
+        if used + tokens > token_budget:
+            remaining = token_budget - used - count_tokens(header)
+            if remaining < MIN_PASSAGE_TOKENS:
+                break
+            block = f"{header}\n{_truncate_to_tokens(passage['text'], remaining)}"
+            tokens = count_tokens(block)
+        blocks.append(block)
+        used += tokens + 1
+
+    context = "\n\n".join(blocks)
+    baseline_tokens = count_tokens(json_context(docs, metadatas))
+    tokens = count_tokens(context)
+    stats = {
+        "chunks": len(docs),
+        "passages": len(blocks),
+        "dropped_duplicates": len(merged) - len(passages),
+        "tokens": tokens,
+        "baseline_tokens": baseline_tokens,
+        "tokens_saved": baseline_tokens - tokens,
+    }
+    _record(stats)
+    return context, stats
+
+
+def json_context(docs: List[str], metadatas: List[Dict]) -> str:
+    """The original indented-JSON context (query_vector_database_tool.build_context_json)."""
+    context_list = [
+        {
+            "source": meta.get("source", "unknown_source.txt").replace(".txt", ""),
+            "page": meta.get("page", "Unknown page"),
+            "content": doc.strip()
+        }
+        for doc, meta in zip(docs, metadatas)
+    ]
+    return json.dumps({"context_results": context_list}, indent=4, ensure_ascii=False)
+
+
+_totals = {"questions": 0, "tokens": 0, "baseline_tokens": 0}
+_totals_lock = threading.Lock()
+
+
+def _record(stats: Dict) -> None:
+    with _totals_lock:
+        _totals["questions"] += 1
+        _totals["tokens"] += stats["tokens"]
+        _totals["baseline_tokens"] += stats["baseline_tokens"]
+
+
+def get_context_stats() -> Dict:
+    """Totals over every context assembled in this process."""
+    with _totals_lock:
+        totals = dict(_totals)
+    totals["tokens_saved"] = totals["baseline_tokens"] - totals["tokens"]
+    return totals
@@ -0,0 +1,99 @@
+"""
+Encoder backend benchmark.
+
+Encodes a sample of the stored DRHP chunks with every EMBEDDING_BACKEND and
+reports:
+  - sentences/sec (ingest throughput) and single-question latency (query side)
+  - cosine similarity of each backend's chunk vectors to the stored ones
+    (the collection was built with the fp32 torch model)
+  - retrieval agreement: overlap of the top-k chunks found for the eval
+    questions with the torch backend's top-k, on the stored collection
+
+The onnx backends need `optimum[onnxruntime]` installed; backends that fail
+to load are reported and skipped.
+
+Usage:
+    python tools/encoder_benchmark.py
+    python tools/encoder_benchmark.py --backends torch onnx-int8 --sample 1000 --k 5
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from Utilities.utils import EMBEDDING_BACKENDS, get_dhrp_collection, load_embedding_model
+from Utilities.parameter_utils import eval_questions
+
+
+def _cosine_rows(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def top_k_ids(collection, query_embeddings, k):
+    results = collection.query(query_embeddings=[list(map(float, e)) for e in query_embeddings], n_results=k)
+    return [set(ids) for ids in results["ids"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding backends on the stored DRHP collection.")
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--sample", type=int, default=512, help="stored chunks to encode")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    collection = get_dhrp_collection()
+    stored = collection.get(limit=args.sample, include=["documents", "embeddings"])
+    documents = stored["documents"]
+    stored_embeddings = np.asarray(stored["embeddings"], dtype=np.float32)
+    questions = [question for item in eval_questions for question in item.values()]
+    if not documents:
+        print("The collection is empty, run the ingest first.")
+        return 1
+
+    print(f"{len(documents)} chunks, {len(questions)} questions, top-{args.k}\n")
+    print(f"{'backend':<11} {'load s':>7} {'sent/s':>8} {'query ms':>9} {'cos vs stored':>14} {'top-k overlap':>14}")
+
+    reference_top_k = None
+    for backend in args.backends:
+        try:
+            started = time.perf_counter()
+            model = load_embedding_model(backend)
+            load_seconds = time.perf_counter() - started
+        except Exception as e:
+            print(f"{backend:<11} failed to load: {e}")
+            continue
+
+        model.encode(documents[:args.batch_size], batch_size=args.batch_size)  # warm-up
+
+        started = time.perf_counter()
+        embeddings = model.encode(documents, batch_size=args.batch_size)
+        sentences_per_second = len(documents) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        query_embeddings = [model.encode([question])[0] for question in questions]
+        query_ms = (time.perf_counter() - started) / len(questions) * 1000
+
+        cosine = float(np.mean(_cosine_rows(np.asarray(embeddings, dtype=np.float32), stored_embeddings)))
+
+        found = top_k_ids(collection, query_embeddings, args.k)
+        if reference_top_k is None:
+            # the first backend listed (torch by default) is the reference
+            reference_top_k = found
+        overlap = np.mean([len(a & b) / args.k for a, b in zip(found, reference_top_k)])
+
+        print(f"{backend:<11} {load_seconds:>7.1f} {sentences_per_second:>8.1f} {query_ms:>9.1f} "
+              f"{cosine:>14.4f} {overlap:>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
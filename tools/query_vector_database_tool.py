@@ -1,68 +1,354 @@
-import json
-from Utilities.utils import embedding_model, dhrp_doc_collection, MODEL, call_llm
+import asyncio
+from Utilities.utils import (get_embedding_model, get_dhrp_collection, get_query_embedding_cache, get_lexical_index,
+                             get_vector_compressor, get_compressed_collection, get_rerank_store,
+                             MODEL, call_llm, AsyncLLMClient, RETRIEVAL_MODE, RERANK_CANDIDATES,
+                             embedding_cache_key)
+from Utilities.vector_compression import rerank
+from tools.context_builder import assemble_context, json_context
 
 
-def get_relevant_docs(question, collection, top_k=5):
-    print('reteriving sentence documents for company...')
+RETRIEVAL_MODES = ("dense", "hybrid")
+
+# hybrid mode: candidates taken from each retriever before fusion, and the RRF damping constant
+HYBRID_CANDIDATES = 20
+RRF_K = 60
+
+
+def encode_questions(questions):
+    """Embeds a list of questions, going through the on-disk query cache when enabled."""
+    embedding_model = get_embedding_model()
+    query_embedding_cache = get_query_embedding_cache()
+    if query_embedding_cache is None:
+        return embedding_model.encode(list(questions))
+    return query_embedding_cache.encode(embedding_cache_key(), embedding_model.encode, questions)
+
+
+def company_filter(company):
+    # chunks are tagged with their company at ingest (see Utilities.company_utils)
+    return {"company": company} if company else None
+
+
+def _resolve_mode(mode):
+    mode = mode or RETRIEVAL_MODE
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Invalid retrieval mode: {mode}. Use one of {RETRIEVAL_MODES}.")
+    return mode
+
 
-    embedded_question = embedding_model.encode(question)
-    print(f"Embedded question:")
+def fuse_results(result_lists, top_k, rrf_k=RRF_K):
+    """
+    Reciprocal rank fusion of single-query results (Chroma-shaped dicts):
+    every chunk scores sum(1 / (rrf_k + rank)) over the lists it appears in.
+    Returns the top_k chunks in the same shape, with `rrf_scores` instead of distances.
+    """
+    scores = {}
+    entries = {}
+    for results in result_lists:
+        ranked = zip(results["ids"][0], results["documents"][0], results["metadatas"][0])
+        for rank, (chunk_id, document, metadata) in enumerate(ranked, start=1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank)
+            entries.setdefault(chunk_id, (document, metadata))
 
-    results = dhrp_doc_collection.query(
-            query_embeddings=[embedded_question],
-            n_results=top_k
+    top_ids = sorted(scores, key=scores.get, reverse=True)[:top_k]
+    return {
+        "ids": [top_ids],
+        "documents": [[entries[chunk_id][0] for chunk_id in top_ids]],
+        "metadatas": [[entries[chunk_id][1] for chunk_id in top_ids]],
+        "rrf_scores": [[scores[chunk_id] for chunk_id in top_ids]],
+    }
+
+
+def _fuse_with_lexical(questions, dense_results, top_k, n_candidates, company):
+    lexical_index = get_lexical_index()
+    return [
+        fuse_results([dense, lexical_index.search(question, n_candidates, company)], top_k)
+        for question, dense in zip(questions, dense_results)
+    ]
+
+
+def _compressed_query(embeddings, n_results, company):
+    """
+    Dense search through the compressed index: RERANK_CANDIDATES hits from the
+    reduced-dimension collection, re-ranked with the full float16 vectors.
+    Returns single-query results (ids / documents / metadatas / distances), one per embedding.
+    """
+    compressor = get_vector_compressor()
+    compressed_collection = get_compressed_collection()
+    space = (compressed_collection.metadata or {}).get("hnsw:space", "l2")
+
+    candidates = compressed_collection.query(
+            query_embeddings=compressor.transform(embeddings).tolist(),
+            n_results=max(n_results, RERANK_CANDIDATES),
+            where=company_filter(company),
+            include=["distances"]
             )
+    ranked = [rerank(embedding, candidate_ids, get_rerank_store(), n_results, space)
+              for embedding, candidate_ids in zip(embeddings, candidates["ids"])]
+
+    # documents come from the full collection, only for the chunks that made the cut
+    wanted = sorted({chunk_id for hits in ranked for chunk_id, _ in hits})
+    stored = get_dhrp_collection().get(ids=wanted, include=["documents", "metadatas"])
+    entries = {chunk_id: (document, metadata)
+               for chunk_id, document, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])}
+
+    per_question = []
+    for hits in ranked:
+        hits = [(chunk_id, distance) for chunk_id, distance in hits if chunk_id in entries]
+        per_question.append({
+            "ids": [[chunk_id for chunk_id, _ in hits]],
+            "documents": [[entries[chunk_id][0] for chunk_id, _ in hits]],
+            "metadatas": [[entries[chunk_id][1] for chunk_id, _ in hits]],
+            "distances": [[distance for _, distance in hits]],
+        })
+    return per_question
+
+
+def _use_compressed_index(collection):
+    # an explicitly passed collection is always searched as is
+    return collection is None and get_vector_compressor() is not None
+
+
+def get_relevant_docs(question, collection=None, top_k=5, company=None, mode=None):
+    print('reteriving sentence documents for company...')
+
+    use_compressed = _use_compressed_index(collection)
+    collection = collection if collection is not None else get_dhrp_collection()
+    mode = _resolve_mode(mode)
+    n_results = max(top_k, HYBRID_CANDIDATES) if mode == "hybrid" else top_k
+
+    embedded_question = encode_questions([question])[0]
+    print("Embedded question:")
+
+    if use_compressed:
+        results = _compressed_query([embedded_question], n_results, company)[0]
+    else:
+        results = collection.query(
+                query_embeddings=[embedded_question],
+                n_results=n_results,
+                where=company_filter(company)
+                )
         # display(f"Top {top_k} relevant documents for question '{question}':{results}\n")
+    if mode == "hybrid":
+        return _fuse_with_lexical([question], [results], top_k, n_results, company)[0]
     return results
 
 
+def _split_query_results(results, n_queries):
+    # chroma returns one list per query embedding, re-shape to single-query results
+    per_question = []
+    for i in range(n_queries):
+        single = {}
+        for field, value in results.items():
+            if isinstance(value, list) and len(value) == n_queries:
+                single[field] = [value[i]]
+            else:
+                single[field] = value
+        per_question.append(single)
+    return per_question
+
+
+def get_relevant_docs_batch(questions, collection=None, top_k=5, company=None, mode=None):
+    """
+    Retrieves documents for many questions at once: one encode call for all
+    questions and a single collection query with every embedding.
+    With `company` set, only that company's DRHP chunks are searched.
+    mode="hybrid" (default from IPO_CHECKER_RETRIEVAL_MODE) also searches the
+    BM25 index and fuses both rankings with reciprocal rank fusion.
+    Returns a list of results shaped like get_relevant_docs output, in question order.
+    """
+    if not questions:
+        return []
+
+    print(f'reteriving sentence documents for {len(questions)} questions...')
+
+    use_compressed = _use_compressed_index(collection)
+    collection = collection if collection is not None else get_dhrp_collection()
+    mode = _resolve_mode(mode)
+    n_results = max(top_k, HYBRID_CANDIDATES) if mode == "hybrid" else top_k
+
+    embedded_questions = encode_questions(questions)
+
+    if use_compressed:
+        per_question = _compressed_query(list(embedded_questions), n_results, company)
+    else:
+        results = collection.query(
+                query_embeddings=list(embedded_questions),
+                n_results=n_results,
+                where=company_filter(company)
+                )
+        per_question = _split_query_results(results, len(questions))
+    if mode == "hybrid":
+        return _fuse_with_lexical(questions, per_question, top_k, n_results, company)
+    return per_question
+
+
 def build_context_json(documents):
     print('building context in JSON...')
 
     docs = documents.get("documents", [[]])[0]      
     metadatas = documents.get("metadatas", [[]])[0]
 
-    context_list = []
+    return json_context(docs, metadatas)
 
-    for doc, meta in zip(docs, metadatas):
-        entry = {
-            "source": meta.get("source", "unknown_source.txt").replace(".txt", ""),
-            "page": meta.get("page", "Unknown page"),
-            "content": doc.strip()
-        }
-        context_list.append(entry)
 
-    return json.dumps({"context_results": context_list}, indent=4, ensure_ascii=False)
+def build_context(documents, token_budget=None):
+    """Merged, deduplicated, token-budgeted context (see tools.context_builder); logs the tokens saved."""
+    context, stats = assemble_context(documents, token_budget)
+    print(f"context: {stats['chunks']} chunks -> {stats['passages']} passages, "
+          f"{stats['tokens']} tokens (JSON context {stats['baseline_tokens']}, saved {stats['tokens_saved']})")
+    return context
+
+
+def build_system_message(context):
+    return f'''You are a Senior IPO Investment Analyst and SEBI-registered Research Analyst equivalent. 
+                Use Indian IPO Draft Red Herring Prospectus (DRHP) documents to answer the questions accurately.
+                Summaralize and reference the relevant sections from the DRHP documents in your answers.
+                Use the following context to answer the questions.\n\nContext:\n
+                {context}'''
+
+
+def _flatten_questions(parameters):
+    return [(key, question) for questions in parameters for key, question in questions.items()]
 
 
 # rag answer pipeline that returns dict
 
-def rag_pipeline(parameters,collection):
+def rag_pipeline(parameters, collection, concurrent=False, max_concurrency=None, company=None):
+    """
+    Answers every question in `parameters` (list of {topic: question} dicts).
+    Retrieval for all questions is batched into one encode and one query,
+    scoped to `company` (a company_utils.company_key) when given.
+    With concurrent=True the LLM calls run in parallel through AsyncLLMClient;
+    answers are returned in the same order either way.
+    """
+    if concurrent:
+        return asyncio.run(arag_pipeline(parameters, collection, max_concurrency=max_concurrency, company=company))
+
+    items = _flatten_questions(parameters)
+    all_documents = get_relevant_docs_batch([question for _, question in items], collection, company=company)
 
-    
     answers = {}
-    for questions in parameters :
+    for (key, question), documents in zip(items, all_documents):
 
-        for key, question in questions.items() :
+        context = build_context(documents)
 
-            
-            documents = get_relevant_docs(question, collection)
-            context_json = build_context_json(documents)
-        
+        system_message = build_system_message(context)
 
-            system_message = f'''You are a Senior IPO Investment Analyst and SEBI-registered Research Analyst equivalent. 
-                Use Indian IPO Draft Red Herring Prospectus (DRHP) documents to answer the questions accurately.
-                Summaralize and reference the relevant sections from the DRHP documents in your answers.
-                Use the following context to answer the questions.\n\nContext:\n
-                {context_json}'''
-        
-            # print(f'system_message prepared.{system_message}')
+        # print(f'system_message prepared.{system_message}')
+
+        answer = call_llm(MODEL,system_message,question)
+
+        print('llm answers')
+
+        answers[key] = answer
 
-            answer = call_llm(MODEL,system_message,question)
-        
-            print('llm answers')
-            
-            answers[key] = answer
-    
 
     return answers
+
+
+async def aanswer_question(question, collection, llm_client, documents=None, company=None):
+    if documents is None:
+        # retrieval is blocking (model + chroma), keep it off the event loop
+        documents = await asyncio.to_thread(get_relevant_docs, question, collection, company=company)
+    context = build_context(documents)
+
+    system_message = build_system_message(context)
+    answer = await llm_client.call_llm(MODEL, system_message, question)
+
+    print('llm answers')
+    return answer
+
+
+async def arag_pipeline(parameters, collection, llm_client=None, max_concurrency=None, company=None):
+    """Async version of rag_pipeline, answers all questions concurrently."""
+    items = _flatten_questions(parameters)
+
+    owns_client = llm_client is None
+    if owns_client:
+        llm_client = AsyncLLMClient(max_concurrency=max_concurrency)
+
+    try:
+        all_documents = await asyncio.to_thread(
+            get_relevant_docs_batch, [question for _, question in items], collection, company=company
+        )
+        results = await asyncio.gather(
+            *(aanswer_question(question, collection, llm_client, documents)
+              for (_, question), documents in zip(items, all_documents))
+        )
+    finally:
+        if owns_client:
+            await llm_client.close()
+
+    # gather keeps input order, so topics line up with their answers
+    return {key: answer for (key, _), answer in zip(items, results)}
+
+
+async def amerge_streams(streams):
+    """Yields items from several async generators as they are produced; errors propagate."""
+    queue = asyncio.Queue()
+    finished = object()
+
+    async def pump(stream):
+        try:
+            async for item in stream:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await queue.put(finished)
+
+    tasks = [asyncio.create_task(pump(stream)) for stream in streams]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is finished:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def astream_answer(key, question, documents, llm_client):
+    """
+    Streams one answer: {"event": "token", "topic", "text"} per LLM delta,
+    then {"event": "answer", "topic", "answer"} with the full text.
+    """
+    system_message = build_system_message(build_context(documents))
+
+    parts = []
+    async for delta in llm_client.stream_llm(MODEL, system_message, question):
+        parts.append(delta)
+        yield {"event": "token", "topic": key, "text": delta}
+
+    yield {"event": "answer", "topic": key, "answer": "".join(parts)}
+
+
+async def astream_rag_pipeline(parameters, collection, llm_client=None, max_concurrency=None, company=None):
+    """
+    Streaming arag_pipeline: answers all questions concurrently and yields
+    token / answer events (see astream_answer) as they arrive, so callers can
+    show every topic while it is being written.
+    """
+    items = _flatten_questions(parameters)
+
+    owns_client = llm_client is None
+    if owns_client:
+        llm_client = AsyncLLMClient(max_concurrency=max_concurrency)
+
+    try:
+        all_documents = await asyncio.to_thread(
+            get_relevant_docs_batch, [question for _, question in items], collection, company=company
+        )
+        streams = [astream_answer(key, question, documents, llm_client)
+                   for (key, question), documents in zip(items, all_documents)]
+        async for event in amerge_streams(streams):
+            yield event
+    finally:
+        if owns_client:
+            await llm_client.close()
@@ -0,0 +1,100 @@
+"""
+Dense vs hybrid (dense + BM25, RRF) retrieval benchmark.
+
+For the eval questions that hinge on exact DRHP terms, a chunk counts as
+relevant when it contains one of the topic's key terms. The report gives
+recall@k and the context size each k puts into the prompt, so you can see
+which top_k dense search needs to reach the recall hybrid gets at a small k.
+
+Run the ingest first (Chuncking_and_embedding/embedding_dhrp.py), it builds
+the BM25 index next to ChromaDB.
+
+Usage:
+    python tools/retrieval_benchmark.py
+    python tools/retrieval_benchmark.py --company "Tata Capital" --k 3 5 10 20
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from Utilities.utils import get_dhrp_collection
+from Utilities.parameter_utils import eval_questions
+from Utilities.company_utils import resolve_company
+from tools.query_vector_database_tool import RETRIEVAL_MODES, company_filter, get_relevant_docs_batch
+
+
+# topic -> terms a relevant chunk contains (matched case-insensitively)
+KEY_TERMS = {
+    "Debt to Equity Ratio": ["debt-equity", "debt to equity", "debt-to-equity"],
+    "Type of Issue": ["offer for sale", "fresh issue"],
+    "Use of Proceeds": ["objects of the issue", "objects of the offer"],
+    "Litigation/Investigation": ["cbi", "sfio", "serious fraud investigation office",
+                                 "central bureau of investigation"],
+    "Customer Concentration": ["top ten customers", "top 10 customers", "top five customers",
+                               "top 5 customers", "largest customer"],
+    "Cash Flow from Operations (CFO)": ["net cash flow from operating activities",
+                                        "net cash generated from operating activities"],
+}
+
+# rough chars per token for English prose
+CHARS_PER_TOKEN = 4
+
+
+def relevant_ids(collection, company):
+    """Chunk ids per topic whose text contains one of the topic's key terms."""
+    stored = collection.get(where=company_filter(company), include=["documents"])
+    relevant = {topic: set() for topic in KEY_TERMS}
+    for chunk_id, document in zip(stored["ids"], stored["documents"]):
+        text = document.lower()
+        for topic, terms in KEY_TERMS.items():
+            if any(term in text for term in terms):
+                relevant[topic].add(chunk_id)
+    return relevant
+
+
+def evaluate(questions, relevant, collection, company, mode, k):
+    """Mean recall@k over the questions and mean context size in chars."""
+    results = get_relevant_docs_batch(list(questions.values()), collection, top_k=k,
+                                      company=company, mode=mode)
+    recalls = []
+    context_chars = []
+    for topic, result in zip(questions, results):
+        hits = len(set(result["ids"][0]) & relevant[topic])
+        recalls.append(hits / min(k, len(relevant[topic])))
+        context_chars.append(sum(len(document) for document in result["documents"][0]))
+    return sum(recalls) / len(recalls), sum(context_chars) / len(context_chars)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@k of dense vs hybrid DRHP retrieval.")
+    parser.add_argument("--company", help="IPO / company name to scope retrieval to")
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5, 10, 20])
+    args = parser.parse_args()
+
+    company = resolve_company(args.company) if args.company else None
+    collection = get_dhrp_collection()
+
+    all_questions = {topic: question for item in eval_questions for topic, question in item.items()}
+    relevant = relevant_ids(collection, company)
+    questions = {topic: all_questions[topic] for topic in KEY_TERMS
+                 if topic in all_questions and relevant[topic]}
+    if not questions:
+        print("No chunk contains any of the key terms, nothing to measure.")
+        return 1
+
+    print(f"Company: {company or 'all'}, {len(questions)} questions "
+          f"({', '.join(f'{topic}: {len(relevant[topic])}' for topic in questions)} relevant chunks)\n")
+    print(f"{'mode':<8} {'k':>4} {'recall@k':>9} {'context chars':>14} {'~tokens':>8}")
+    for mode in RETRIEVAL_MODES:
+        for k in args.k:
+            recall, chars = evaluate(questions, relevant, collection, company, mode, k)
+            print(f"{mode:<8} {k:>4} {recall:>9.2f} {chars:>14,.0f} {chars / CHARS_PER_TOKEN:>8,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())